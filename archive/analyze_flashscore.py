@@ -5,11 +5,14 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 from webdriver_manager.chrome import ChromeDriverManager
 import time
 import logging
 
+from consent import BANNER_WAIT, accept_consent
+from waits import OptionalLookup
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -41,6 +44,7 @@ class FlashscoreAnalyzer:
         )
         self.driver.implicitly_wait(20)
         self.wait = WebDriverWait(self.driver, 20)
+        self.optional = OptionalLookup(self.driver)
         
     def wait_for_element(self, by, value, timeout=10):
         """Wait for an element to be present and visible"""
@@ -55,13 +59,7 @@ class FlashscoreAnalyzer:
 
     def handle_consent(self):
         """Handle GDPR consent popup"""
-        try:
-            consent_button = self.wait.until(
-                EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-            )
-            self.driver.execute_script("arguments[0].click();", consent_button)
-            time.sleep(2)
-        except (TimeoutException, NoSuchElementException):
+        if not accept_consent(self.driver, banner_wait=BANNER_WAIT):
             logger.info("No consent popup found or already accepted")
             
     def analyze_main_page(self):
@@ -83,7 +81,8 @@ class FlashscoreAnalyzer:
                 
             print("Analyzing page structure...")
             
-            # Try different selectors for tournaments
+            # Try different selectors for tournaments; a miss must not cost the 20 s implicit wait
+            self.optional.start_page(url)
             selectors = [
                 "//div[contains(@class, 'tournament')]",
                 "//div[contains(@class, 'leagues--static')]",
@@ -92,7 +91,7 @@ class FlashscoreAnalyzer:
             
             for selector in selectors:
                 try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
+                    elements = self.optional.find_all(By.XPATH, selector)
                     if elements:
                         logger.info(f"Found {len(elements)} elements with selector: {selector}")
                         print(f"Found {len(elements)} elements")
@@ -111,6 +110,8 @@ class FlashscoreAnalyzer:
                 except Exception as e:
                     logger.error(f"Error with selector {selector}: {e}")
                     continue
+            
+            self.optional.report()
                     
         except Exception as e:
             logger.error(f"Error analyzing main page: {e}")
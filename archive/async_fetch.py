@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+import asyncio
+import logging
+import random
+from typing import Dict, Iterable, Optional, Union
+from urllib.parse import urlsplit
+
+import httpx
+
+from rate_limit import RateLimiter, is_blocked, retry_after as retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+# Constants
+MAX_CONNECTIONS = 200
+MAX_KEEPALIVE = 50
+PER_HOST_LIMIT = 16
+TIMEOUT = 15
+RETRIES = 3
+BACKOFF_BASE = 0.5  # Seconds, doubled on every attempt and jittered
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AsyncFetcher:
+    """asyncio fetch engine with a keep-alive pool, per-host caps and jittered retries"""
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, http2: bool = False,
+                 max_connections: int = MAX_CONNECTIONS, per_host_limit: int = PER_HOST_LIMIT,
+                 timeout: float = TIMEOUT, retries: int = RETRIES, backoff_base: float = BACKOFF_BASE,
+                 limiter: Optional[RateLimiter] = None):
+        self.headers = headers or {}
+        # The per-host token bucket the synchronous clients use; its wait runs off the event loop
+        self.limiter = limiter
+        self.http2 = http2  # Needs the h2 package (pip install httpx[http2])
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            http2=self.http2,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=MAX_KEEPALIVE
+            ),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.client.aclose()
+        self.client = None
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff_base * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def fetch(self, url: str) -> str:
+        """GET one URL, retrying transport errors, 429 and 5xx with jittered backoff"""
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            # The host slot is held for the request only, not through the backoff sleep
+            async with self._host_limit(url):
+                try:
+                    if self.limiter:
+                        await asyncio.to_thread(self.limiter.wait)
+                    response = await self.client.get(url)
+                    if self.limiter and is_blocked(response.status_code):
+                        self.limiter.backoff(retry_after_seconds(response.headers))
+                    if response.status_code not in RETRY_STATUSES:
+                        response.raise_for_status()
+                        return response.text
+                    retry_after = response.headers.get("Retry-After")
+                    error = httpx.HTTPStatusError(
+                        f"{response.status_code} for {url}", request=response.request, response=response
+                    )
+                except httpx.TransportError as e:
+                    error = e
+
+            if attempt == self.retries:
+                raise error
+            delay = self._backoff(attempt, retry_after)
+            logger.warning(f"Attempt {attempt + 1} failed for {url}: {error}; retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def fetch_all(self, urls: Iterable[str]) -> Dict[str, Union[str, Exception]]:
+        """Fetch many URLs concurrently; failures come back as the exception instead of a body"""
+        urls = list(urls)
+        results = await asyncio.gather(*(self.fetch(url) for url in urls), return_exceptions=True)
+        return dict(zip(urls, results))
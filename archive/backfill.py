@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from multiprocessing.util import Finalize
+from typing import List, NamedTuple, Optional, Sequence
+
+from driver_pool import DriverPool
+from league_season_scraper import LeagueSeasonScraper, REQUESTS_PER_SECOND
+from output_writers import JsonlWriter
+from rate_limit import for_host
+
+logger = logging.getLogger(__name__)
+
+# Constants
+WORKERS = 3  # Browser processes; the shared rate limit, not the worker count, sets the request rate
+SEASONS = 10
+PAGES = ("results",)
+OUTPUT_DIR = os.path.join("data", "seasons")
+LEAGUES = [
+    "https://www.flashscore.com/football/england/premier-league",
+    "https://www.flashscore.com/football/spain/laliga",
+    "https://www.flashscore.com/football/italy/serie-a",
+    "https://www.flashscore.com/football/germany/bundesliga",
+    "https://www.flashscore.com/football/france/ligue-1",
+]
+
+
+class Task(NamedTuple):
+    """One independent unit of backfill work: a listing page of one league season"""
+    league_url: str
+    season: str
+    page: str
+    current: bool  # The running season has no "-YYYY-YYYY" archive URL
+
+    @property
+    def league(self) -> str:
+        return self.league_url.rstrip("/").split("/")[-1]
+
+    @property
+    def url(self) -> str:
+        return self.league_url if self.current else f"{self.league_url}-{self.season}"
+
+    @property
+    def name(self) -> str:
+        return f"{self.league}/{self.season}/{self.page}"
+
+    def output_file(self, output_dir: str = OUTPUT_DIR) -> str:
+        return os.path.join(output_dir, self.league, f"{self.season}_{self.page}.jsonl")
+
+
+def current_season(today: Optional[date] = None) -> str:
+    """European football season running on a date; seasons turn over in July"""
+    today = today or date.today()
+    start = today.year if today.month >= 7 else today.year - 1
+    return f"{start}-{start + 1}"
+
+
+def last_seasons(count: int = SEASONS, today: Optional[date] = None) -> List[str]:
+    """The current season and the count - 1 before it, newest first"""
+    start = int(current_season(today).split("-")[0])
+    return [f"{year}-{year + 1}" for year in range(start, start - count, -1)]
+
+
+def plan(leagues: Sequence[str], seasons: Sequence[str], pages: Sequence[str] = PAGES,
+         output_dir: str = OUTPUT_DIR, force: bool = False) -> List[Task]:
+    """Expand leagues x seasons x pages into tasks, skipping finished seasons whose output already exists"""
+    running = current_season()
+    tasks = []
+    skipped = 0
+    for league_url in leagues:
+        for season in seasons:
+            for page in pages:
+                task = Task(league_url, season, page, season == running)
+                # The running season keeps gaining results, so its file is never final
+                if not force and not task.current and os.path.exists(task.output_file(output_dir)):
+                    skipped += 1
+                    continue
+                tasks.append(task)
+    logger.info(f"Planned {len(tasks)} tasks ({skipped} already done)")
+    return tasks
+
+
+class Progress:
+    """Completed, empty, failed and remaining task counts with an ETA from the average task time"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.empty = 0  # Done, but the page listed no matches
+        self.failed = 0
+        self.matches = 0
+        self.started = time.monotonic()
+
+    def update(self, matches: Optional[int]):
+        if matches is None:
+            self.failed += 1
+        else:
+            self.done += 1
+            self.empty += matches == 0
+            self.matches += matches
+
+    def eta(self) -> Optional[float]:
+        finished = self.done + self.failed
+        if not finished:
+            return None
+        return (time.monotonic() - self.started) / finished * (self.total - finished)
+
+    def log(self, task: Task, matches: Optional[int]):
+        eta = self.eta()
+        eta_text = f"{eta / 60:.0f} min" if eta is not None else "unknown"
+        result = "FAILED" if matches is None else f"{matches} matches" if matches else "no matches"
+        logger.info(
+            f"[{self.done + self.failed}/{self.total}] {task.name}: {result} "
+            f"- {self.matches} matches total, {self.empty} empty, {self.failed} failed, ETA {eta_text}"
+        )
+
+
+# Per-process worker state, set up once by init_worker
+_pool: Optional[DriverPool] = None
+_requests_per_second = REQUESTS_PER_SECOND
+
+
+def init_worker(requests_per_second: float):
+    """Start one warm browser per worker process"""
+    global _pool, _requests_per_second
+    # force: league_season_scraper already pointed logging at its own file when it was imported
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(levelname)s - %(message)s', force=True)
+    _requests_per_second = requests_per_second
+    _pool = DriverPool(size=1)
+    _pool.start()
+    # Pool workers exit without running atexit handlers; finalizers still run
+    Finalize(_pool, _pool.close, exitpriority=10)
+
+
+def run_task(task: Task, output_dir: str = OUTPUT_DIR) -> Optional[int]:
+    """Scrape one task into its own file; returns the match count, 0 for a page without matches"""
+    output_file = task.output_file(output_dir)
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    partial_file = f"{output_file}.part"
+    if os.path.exists(partial_file):
+        os.remove(partial_file)
+
+    # Matches are written as the results page expands; strict, so a page cut short raises instead of ending early
+    try:
+        with _pool.driver() as driver, JsonlWriter(partial_file) as writer:
+            # The host's token bucket lives in a lock-guarded file, so all workers share one limit
+            limiter = for_host(task.url, _requests_per_second)
+            for match in LeagueSeasonScraper(driver, limiter).iter_season_matches(task.url, task.page, strict=True):
+                match.update(league=task.league, season=task.season)
+                writer.write(match)
+    except Exception:
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+        raise
+    if not writer.count:
+        # Kept as an empty file, so a season the league did not play is not planned again every run
+        logger.warning(f"No matches listed for {task.name}")
+
+    # Only a complete page becomes visible, so an interrupted task is simply planned again
+    os.replace(partial_file, output_file)
+    return writer.count
+
+
+def backfill(tasks: Sequence[Task], workers: int = WORKERS, requests_per_second: float = REQUESTS_PER_SECOND,
+             output_dir: str = OUTPUT_DIR) -> Progress:
+    """Run tasks on a process pool of browser workers behind one global rate limit"""
+    progress = Progress(len(tasks))
+    if not tasks:
+        return progress
+
+    context = multiprocessing.get_context("spawn")  # Chrome and forked selenium state don't mix
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context,
+                             initializer=init_worker, initargs=(requests_per_second,)) as executor:
+        futures = {executor.submit(run_task, task, output_dir): task for task in tasks}
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                matches = future.result()
+            except Exception as e:
+                logger.error(f"Task {task.name} failed: {e}")
+                matches = None
+            progress.update(matches)
+            progress.log(task, matches)
+
+    elapsed = time.monotonic() - progress.started
+    logger.info(f"Backfill finished in {elapsed / 60:.1f} min: {progress.done} tasks done "
+                f"({progress.empty} empty), {progress.failed} failed, {progress.matches} matches")
+    return progress
+
+
+def main():
+    # force: league_season_scraper already pointed logging at its own file when it was imported
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(levelname)s - %(message)s', force=True)
+    parser = argparse.ArgumentParser(description="Backfill league seasons in parallel")
+    parser.add_argument("--leagues", nargs="+", default=LEAGUES, help="League URLs")
+    parser.add_argument("--seasons", nargs="+", help="Seasons such as 2023-2024 (default: the last --season-count)")
+    parser.add_argument("--season-count", type=int, default=SEASONS)
+    parser.add_argument("--pages", nargs="+", default=list(PAGES), help="Listing pages per season")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Browser worker processes")
+    parser.add_argument("--rps", type=float, default=REQUESTS_PER_SECOND,
+                        help="Page loads per second across all workers")
+    parser.add_argument("--output-dir", type=str, default=OUTPUT_DIR)
+    parser.add_argument("--force", action="store_true", help="Redo tasks whose output already exists")
+    args = parser.parse_args()
+
+    seasons = args.seasons or last_seasons(args.season_count)
+    tasks = plan(args.leagues, seasons, args.pages, args.output_dir, args.force)
+    progress = backfill(tasks, args.workers, args.rps, args.output_dir)
+    if progress.failed:
+        logger.warning(f"{progress.failed} tasks failed; run again to retry them")
+
+
+if __name__ == "__main__":
+    main()
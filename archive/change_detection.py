@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DIGEST_FILE = "digests.sqlite"
+HASH_FIELD = "content_hash"
+# Bookkeeping that changes on every scrape without the match changing
+TIMESTAMP_FIELDS = ("scraped_at", "polled_at")
+VOLATILE_FIELDS = (HASH_FIELD,) + TIMESTAMP_FIELDS
+
+DIGEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    key TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    record TEXT,
+    seen_at REAL NOT NULL
+);
+"""
+
+
+def content_hash(record: Dict[str, Any]) -> str:
+    """SHA-256 of the record's canonical JSON, ignoring volatile fields"""
+    content = {key: value for key, value in record.items() if key not in VOLATILE_FIELDS}
+    body = json.dumps(content, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+def field_delta(old: Any, new: Any, path: str = "", delta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Field-level changes from old to new as dotted paths: {"set": {path: value}, "unset": [path],
+    "append"/"prepend": {path: items}}; lists that only grew at one end (commentary, events) keep just the new items
+    """
+    delta = {} if delta is None else delta
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old.keys() - new.keys():
+            delta.setdefault("unset", []).append(f"{path}{key}")
+        for key, value in new.items():
+            if key in old:
+                field_delta(old[key], value, f"{path}{key}.", delta)
+            else:
+                delta.setdefault("set", {})[f"{path}{key}"] = value
+        return delta
+
+    name = path[:-1]
+    if old == new:
+        return delta
+    if isinstance(old, list) and isinstance(new, list) and old and len(new) > len(old):
+        if new[:len(old)] == old:
+            delta.setdefault("append", {})[name] = new[len(old):]
+            return delta
+        if new[-len(old):] == old:
+            delta.setdefault("prepend", {})[name] = new[:-len(old)]
+            return delta
+    delta.setdefault("set", {})[name] = new
+    return delta
+
+
+def apply_delta(record: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild the new record from the previous one and a field_delta (keys must not contain dots)"""
+    record = json.loads(json.dumps(record))
+
+    def parent(path: str) -> Tuple[Dict[str, Any], str]:
+        *keys, last = path.split(".")
+        node = record
+        for key in keys:
+            node = node.setdefault(key, {})
+        return node, last
+
+    for path in delta.get("unset", []):
+        node, key = parent(path)
+        node.pop(key, None)
+    for path, value in delta.get("set", {}).items():
+        node, key = parent(path)
+        node[key] = value
+    for path, items in delta.get("append", {}).items():
+        node, key = parent(path)
+        node[key] = node.get(key, []) + items
+    for path, items in delta.get("prepend", {}).items():
+        node, key = parent(path)
+        node[key] = items + node.get(key, [])
+    return record
+
+
+class DigestIndex:
+    """Last-seen content hash per match, plus the record itself when deltas are wanted"""
+
+    def __init__(self, path: str = DIGEST_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(DIGEST_SCHEMA)
+
+    def get(self, key: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """(digest, record) last seen for a key; the record is None unless it was stored"""
+        with self._lock:
+            row = self._db.execute("SELECT digest, record FROM digests WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None, None
+        return row[0], json.loads(row[1]) if row[1] else None
+
+    def put(self, key: str, digest: str, record: Optional[Dict[str, Any]] = None):
+        body = json.dumps(record, ensure_ascii=False, separators=(',', ':')) if record is not None else None
+        with self._lock:
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO digests (key, digest, record, seen_at) VALUES (?, ?, ?, ?)",
+                    (key, digest, body, time.time())
+                )
+
+    def delete(self, key: str):
+        with self._lock:
+            with self._db:
+                self._db.execute("DELETE FROM digests WHERE key = ?", (key,))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ChangeFilter:
+    """
+    Writer wrapper that stamps each record with its content hash and passes on only new or changed ones.
+    With deltas, a changed record is written as {id, content_hash, previous_hash, delta} instead of in full.
+    Digests are kept per sink ("<sink>:<id>"), so outputs sharing one index never mark each other's records seen.
+    """
+
+    def __init__(self, writer, index: DigestIndex, sink: str, deltas: bool = False, key_field: str = "id"):
+        self.writer = writer
+        self.index = index
+        self.sink = sink
+        self.deltas = deltas
+        self.key_field = key_field
+        self.seen = 0
+        self.unchanged = 0
+        self.changed = 0
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]):
+        key = record.get(self.key_field)
+        digest = content_hash(record)
+        # Stamped on a copy; the caller's record is left as it was passed in
+        record = {**record, HASH_FIELD: digest}
+        if key is None:
+            # Nothing to compare against; keep the record rather than risk dropping it
+            self.writer.write(record)
+            return
+
+        # Only the digest check and update hold the lock. The digest is recorded before the write, so a
+        # worker finishing the same match meanwhile sees it as unchanged instead of writing it twice
+        index_key = f"{self.sink}:{key}"
+        with self._lock:
+            self.seen += 1
+            previous_digest, previous = self.index.get(index_key)
+            if previous_digest == digest:
+                self.unchanged += 1
+                return
+            self.index.put(index_key, digest, record if self.deltas else None)
+            self.changed += 1
+
+        try:
+            if self.deltas and previous is not None:
+                delta = field_delta(
+                    {k: v for k, v in previous.items() if k not in VOLATILE_FIELDS},
+                    {k: v for k, v in record.items() if k not in VOLATILE_FIELDS}
+                )
+                self.writer.write({
+                    self.key_field: key,
+                    HASH_FIELD: digest,
+                    "previous_hash": previous_digest,
+                    "delta": delta,
+                    **{field: record[field] for field in TIMESTAMP_FIELDS if field in record},
+                })
+            else:
+                self.writer.write(record)
+        except Exception:
+            # Not written after all: restore the previous digest, unless a newer record replaced ours meanwhile
+            with self._lock:
+                self.changed -= 1
+                if self.index.get(index_key)[0] == digest:
+                    if previous_digest is None:
+                        self.index.delete(index_key)
+                    else:
+                        self.index.put(index_key, previous_digest, previous)
+            raise
+
+    def close(self):
+        self.writer.close()
+        logger.info(f"Change detection: {self.changed} new or changed, {self.unchanged} unchanged of {self.seen}")
+
+    def __getattr__(self, name):
+        # count, output_file and anything else the wrapped writer exposes
+        return getattr(self.writer, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+import json
+import logging
+import os
+
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from waits import wait_for_selector
+
+logger = logging.getLogger(__name__)
+
+# Constants
+BASE_URL = "https://www.flashscore.com"
+CONSENT_BUTTON_ID = "onetrust-accept-btn-handler"
+CONSENT_COOKIE_PREFIX = "Optanon"  # OptanonConsent / OptanonAlertBoxClosed
+CONSENT_COOKIES_FILE = "consent_cookies.json"
+BANNER_WAIT = 5  # Seconds the banner may take to be injected after load on a driver that was never primed
+
+# Checks the DOM directly so an absent banner never costs an implicit or explicit wait
+CONSENT_NEEDED_JS = "return !!document.getElementById(arguments[0]);"
+
+
+def consent_needed(driver) -> bool:
+    """Return immediately whether the consent banner is on the page"""
+    try:
+        return bool(driver.execute_script(CONSENT_NEEDED_JS, CONSENT_BUTTON_ID))
+    except WebDriverException:
+        return False
+
+
+def accept_consent(driver, timeout: float = 5, banner_wait: float = 0) -> bool:
+    """Click the consent button only if the banner is present, allowing banner_wait seconds for it to appear"""
+    if not consent_needed(driver):
+        if not banner_wait or wait_for_selector(driver, f"#{CONSENT_BUTTON_ID}", timeout=banner_wait) is None:
+            return False
+    try:
+        consent_button = WebDriverWait(driver, timeout).until(
+            EC.element_to_be_clickable((By.ID, CONSENT_BUTTON_ID))
+        )
+        driver.execute_script("arguments[0].click();", consent_button)
+        logger.info("Accepted GDPR consent")
+        return True
+    except TimeoutException:
+        logger.info("Consent banner present but not clickable")
+        return False
+
+
+def save_consent_cookies(driver, path: str = CONSENT_COOKIES_FILE):
+    """Store the OneTrust consent cookies so other workers can reuse them"""
+    cookies = [c for c in driver.get_cookies() if c["name"].startswith(CONSENT_COOKIE_PREFIX)]
+    if not cookies:
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cookies, f, indent=2)
+    logger.info(f"Saved {len(cookies)} consent cookies to {path}")
+
+
+def load_consent_cookies(driver, path: str = CONSENT_COOKIES_FILE) -> bool:
+    """Inject saved consent cookies; the driver must already be on the Flashscore domain"""
+    if not os.path.exists(path):
+        return False
+    with open(path, "r", encoding="utf-8") as f:
+        cookies = json.load(f)
+    for cookie in cookies:
+        cookie.pop("sameSite", None)
+        cookie.pop("expiry", None)
+        try:
+            driver.add_cookie(cookie)
+        except WebDriverException as e:
+            logger.warning(f"Could not inject cookie {cookie.get('name')}: {e}")
+    return bool(cookies)
+
+
+def prime_consent(driver, path: str = CONSENT_COOKIES_FILE):
+    """Accept consent once per worker, from saved cookies when possible"""
+    driver.get(BASE_URL)
+    if load_consent_cookies(driver, path):
+        driver.refresh()
+        # Saved cookies keep the banner away; only click if it is there anyway, without waiting for it
+        accept_consent(driver)
+        return
+    # The banner is injected after load, so allow it a few seconds once per worker
+    if wait_for_selector(driver, f"#{CONSENT_BUTTON_ID}", timeout=BANNER_WAIT) is None:
+        logger.info("Consent already accepted for this worker")
+        return
+    if accept_consent(driver, timeout=10):
+        save_consent_cookies(driver, path)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, TextIO, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.common.exceptions import WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+
+from consent import CONSENT_COOKIES_FILE, prime_consent
+from resource_blocking import (
+    BlockingReport,
+    DEFAULT_BLOCKED_URLS,
+    enable_performance_logging,
+    enable_resource_blocking,
+)
+
+logger = logging.getLogger(__name__)
+
+# Constants
+POOL_SIZE = 2
+MAX_PAGE_LOADS = 200  # Recycle a driver after this many get() calls
+ACQUIRE_TIMEOUT = 300
+PROFILE_ROOT = "profiles"  # Persistent Chrome profiles, each used by one running driver at a time
+
+
+def try_lock(f: TextIO) -> bool:
+    """Take an exclusive lock on an open file without waiting; it is released when the file closes"""
+    try:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def setup_driver(profile_dir: Optional[str] = None) -> webdriver.Chrome:
+    """Setup and return a headless Chrome WebDriver for the pool"""
+    options = webdriver.ChromeOptions()
+    if profile_dir:
+        # Keeps consent and session cookies between runs
+        options.add_argument(f'--user-data-dir={os.path.abspath(profile_dir)}')
+    options.add_argument('--headless')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument('--log-level=3')
+    options.add_experimental_option('excludeSwitches', ['enable-automation'])
+    options.add_experimental_option('useAutomationExtension', False)
+    enable_performance_logging(options)
+
+    driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
+    driver.implicitly_wait(10)
+    return driver
+
+
+class PooledDriver:
+    """Thin wrapper around a WebDriver that counts page loads"""
+
+    def __init__(self, driver: webdriver.Chrome, slot: int):
+        self._driver = driver
+        self.slot = slot
+        self.page_loads = 0
+        self.broken = False
+
+    def get(self, url: str):
+        self.page_loads += 1
+        return self._driver.get(url)
+
+    def quit(self):
+        # Drivers are owned by the pool; a job quitting one just marks it for replacement
+        self.broken = True
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+
+class DriverPool:
+    """Pool of warm Chrome drivers shared across leagues, dates and match IDs"""
+
+    def __init__(self, size: int = POOL_SIZE, max_page_loads: int = MAX_PAGE_LOADS,
+                 factory: Callable[..., webdriver.Chrome] = setup_driver,
+                 profile_root: Optional[str] = None, consent_cookies: Optional[str] = CONSENT_COOKIES_FILE,
+                 blocked_urls: Optional[List[str]] = DEFAULT_BLOCKED_URLS):
+        self.size = size
+        self.max_page_loads = max_page_loads
+        self.factory = factory
+        self.profile_root = profile_root
+        self.consent_cookies = consent_cookies
+        self.blocked_urls = blocked_urls  # None or [] loads every resource
+        self.blocking_report = BlockingReport()
+        self._idle: "queue.Queue[PooledDriver]" = queue.Queue()
+        self._all: List[PooledDriver] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._profiles: Dict[int, Tuple[str, TextIO]] = {}  # slot -> (profile dir, its held lock file)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        """Warm up all drivers once"""
+        logger.info(f"Warming up driver pool with {self.size} drivers")
+        for slot in range(self.size):
+            self._idle.put(self._create(slot))
+
+    def _create(self, slot: int) -> PooledDriver:
+        pooled = PooledDriver(self._launch(slot), slot)
+        with self._lock:
+            self._all.append(pooled)
+        logger.info(f"Started driver in slot {slot}")
+        return pooled
+
+    def _profile_dir(self, slot: int) -> str:
+        """
+        The first profile directory no other driver holds, kept by the slot until the pool closes. Chrome
+        refuses a profile that is already in use, so pools in several processes must not share one.
+        """
+        with self._lock:
+            if slot in self._profiles:
+                return self._profiles[slot][0]
+            os.makedirs(self.profile_root, exist_ok=True)
+            number = 0
+            while True:
+                path = os.path.join(self.profile_root, f"worker-{number}")
+                lock_file = open(f"{path}.lock", "a+")
+                if try_lock(lock_file):
+                    self._profiles[slot] = (path, lock_file)
+                    return path
+                lock_file.close()
+                number += 1
+
+    def _launch(self, slot: int) -> webdriver.Chrome:
+        """Launch a browser for a slot with resource blocking and consent set up"""
+        if self.profile_root:
+            driver = self.factory(profile_dir=self._profile_dir(slot))
+        else:
+            driver = self.factory()
+
+        if self.blocked_urls:
+            try:
+                enable_resource_blocking(driver, self.blocked_urls)
+            except WebDriverException as e:
+                logger.warning(f"Could not enable resource blocking for slot {slot}: {e}")
+
+        if self.consent_cookies:
+            # Accept consent once per worker rather than once per page
+            try:
+                prime_consent(driver, self.consent_cookies)
+            except WebDriverException as e:
+                logger.warning(f"Could not prime consent for slot {slot}: {e}")
+
+        return driver
+
+    def restart(self, pooled: PooledDriver) -> PooledDriver:
+        """Swap a crashed browser for a new one in place, while the job holding it carries on"""
+        # Its performance log is lost with it; reading a dead driver's log would only raise
+        try:
+            pooled._driver.quit()
+        except Exception:
+            pass
+        pooled._driver = self._launch(pooled.slot)
+        pooled.page_loads = 0
+        pooled.broken = False
+        logger.info(f"Restarted driver in slot {pooled.slot}")
+        return pooled
+
+    def _destroy(self, pooled: PooledDriver):
+        if not pooled.broken:
+            self.blocking_report.collect(pooled._driver)
+        with self._lock:
+            if pooled in self._all:
+                self._all.remove(pooled)
+        try:
+            pooled._driver.quit()
+        except Exception:
+            pass
+
+    def is_healthy(self, pooled: PooledDriver) -> bool:
+        """Check that the browser behind a driver still responds"""
+        if pooled.broken:
+            return False
+        try:
+            pooled._driver.execute_script("return 1")
+            return True
+        except Exception as e:
+            logger.warning(f"Driver in slot {pooled.slot} failed health check: {e}")
+            return False
+
+    def acquire(self, timeout: Optional[float] = ACQUIRE_TIMEOUT) -> PooledDriver:
+        """Take a driver out of the pool, waiting if all are busy"""
+        if self._closed:
+            raise RuntimeError("Driver pool is closed")
+        try:
+            pooled = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No driver available after {timeout} seconds")
+
+        if pooled._driver is None:
+            # The slot lost its browser and could not start a new one on release; try again now
+            try:
+                pooled = self._create(pooled.slot)
+            except Exception:
+                self._idle.put(pooled)
+                raise
+        return pooled
+
+    def release(self, pooled: PooledDriver, broken: bool = False):
+        """Return a driver, replacing it if it crashed or has done too many page loads"""
+        if self._closed:
+            self._destroy(pooled)
+            return
+
+        replace = False
+        if broken or not self.is_healthy(pooled):
+            logger.warning(f"Replacing crashed driver in slot {pooled.slot}")
+            # Nothing left to read from a dead browser's log
+            pooled.broken = True
+            replace = True
+        elif pooled.page_loads >= self.max_page_loads:
+            logger.info(f"Recycling driver in slot {pooled.slot} after {pooled.page_loads} page loads")
+            replace = True
+        else:
+            self.blocking_report.collect(pooled._driver)
+
+        if replace:
+            self._destroy(pooled)
+            try:
+                pooled = self._create(pooled.slot)
+            except Exception as e:
+                logger.error(f"Failed to restart driver in slot {pooled.slot}: {e}")
+                # Keep the slot: an empty placeholder is started lazily by the next acquire
+                pooled = PooledDriver(None, pooled.slot)
+
+        self._idle.put(pooled)
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = ACQUIRE_TIMEOUT):
+        """Context manager handing out a driver and returning it afterwards"""
+        pooled = self.acquire(timeout)
+        broken = False
+        try:
+            yield pooled
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(pooled, broken=broken)
+
+    def close(self):
+        """Quit every driver in the pool"""
+        self._closed = True
+        with self._lock:
+            drivers = list(self._all)
+        for pooled in drivers:
+            self._destroy(pooled)
+        with self._lock:
+            for _, lock_file in self._profiles.values():
+                lock_file.close()
+            self._profiles.clear()
+        if self.blocked_urls:
+            self.blocking_report.log_summary()
+        logger.info("Driver pool closed")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+import argparse
+import logging
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+RECORDINGS_DIR = "feed_recordings"
+HOST = "127.0.0.1"
+PORT = 8765
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Serves recorded feed bodies by name, standing in for the Flashscore feed host"""
+
+    recordings_dir = RECORDINGS_DIR
+
+    def do_GET(self):
+        # /2/x/feed/df_st_1_<id> and /df_st_1_<id> both resolve to the recording df_st_1_<id>
+        feed = os.path.basename(self.path.split("?", 1)[0])
+        path = os.path.join(self.recordings_dir, feed)
+
+        if not feed or not os.path.isfile(path):
+            logger.warning(f"No recording for {self.path}")
+            self.send_error(404, f"No recording for {feed}")
+            return
+
+        with open(path, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.info(format % args)
+
+
+def serve(recordings_dir: str = RECORDINGS_DIR, host: str = HOST, port: int = PORT) -> ThreadingHTTPServer:
+    """Create a replay server; call serve_forever() on it, or run it in a thread for tests"""
+    handler = type("Handler", (ReplayHandler,), {"recordings_dir": recordings_dir})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Flashscore feed responses over HTTP")
+    parser.add_argument("--dir", type=str, default=RECORDINGS_DIR, help="Directory written by http_backend.py --record")
+    parser.add_argument("--host", type=str, default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
+    server = serve(args.dir, args.host, args.port)
+    logger.info(f"Replaying {args.dir} on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Replay server stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
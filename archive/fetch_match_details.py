@@ -0,0 +1,530 @@
+#!/usr/bin/env python
+
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
+
+import argparse
+import datetime
+import logging
+import os
+import threading
+
+import flashscore_selectors as sel
+from change_detection import DIGEST_FILE, ChangeFilter, DigestIndex
+from consent import accept_consent
+from driver_pool import DriverPool, PROFILE_ROOT
+from output_writers import OUTPUT_FORMATS, open_writer
+from html_parser import COMMENTARY_STRAINER, HEADER_STRAINER, STATISTICS_STRAINER, ParsedPage, page_soup
+from page_cache import CACHE_DIR, CacheMiss, PageCache
+from rate_limit import for_host, is_blocked
+from stat_labels import keyed_statistics
+from stat_values import typed_statistics
+from work_queue import DONE, IN_FLIGHT, MATCH, PENDING, QUEUE_FILE, WorkQueue
+from waits import OptionalLookup, wait_for_selector, wait_for_stale
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(threadName)s - %(levelname)s - %(message)s',
+    filename='scraper.log'
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+WORKERS = 4
+REQUESTS_PER_SECOND = 2.0  # Global rate across all workers
+INPUT_FILE = "match_ids_input.txt"
+OUTPUT_DIR = "processed"
+MATCH_URL = "https://www.flashscore.com/match/{match_id}/"
+SUMMARY_TAB = '#/match-summary'
+
+STATISTICS_PERIODS = {
+    'full_time': '',
+    '1st_half': '/1',
+    '2nd_half': '/2',
+    'extra_time': '/3',
+}
+# Tabs many matches simply don't have; every other tab may still be rendering and is waited for
+OPTIONAL_TABS = {
+    '#/match-summary/match-statistics/3',
+    '#/match-summary/live-commentary',
+    '#/report',
+}
+
+
+def tab_url(match_id, href):
+    """Cache key for one tab of a match page"""
+    return MATCH_URL.format(match_id=match_id) + href
+
+
+def read_match_ids(path):
+    """Read match IDs, one per line, skipping blanks"""
+    with open(path, 'r') as match_ids_results:
+        return [line.strip() for line in match_ids_results if line.strip()]
+
+
+def get_match_info(page):
+    soup = page_soup(page, HEADER_STRAINER)
+
+    # Country, League, Round, Date
+    tournament_info = sel.TOURNAMENT.find(soup).text
+
+    # Match Date
+    match_date_scrapped = sel.START_TIME.find(soup).text
+    match_date = datetime.datetime.strptime(match_date_scrapped, '%d.%m.%Y %H:%M').isoformat()
+
+    # Teams
+    home_team = sel.HOME_TEAM.find(soup).text
+    away_team = sel.AWAY_TEAM.find(soup).text
+
+    # Results
+    score = {}
+
+    # full_time, final_result
+    full_time_result = sel.FULL_TIME_SCORE.find(soup)
+    final_result = sel.FINAL_SCORE.find(soup)
+    if full_time_result is None:
+        score['final_result'] = final_result.text
+    else:
+        score['full_time'] = full_time_result.text.replace("(", "").replace(")", "")
+        score['final_result'] = final_result.text
+
+    score['match_status'] = sel.MATCH_STATUS.find(soup).text
+
+    # first_half, second_half, extra_time, penalties
+    half_score_data = sel.HALF_SCORES.find_all(soup)
+    for x in half_score_data:
+        key = x.find_all('span')[0].text.lower()
+        value = x.find_all('span')[1].text.replace(" ", "")
+        score = score | {key: value}
+
+    match_info = {}
+    match_info_keys = sel.INFO_LABELS.find_all(soup)
+    match_info_values = sel.INFO_VALUES.find_all(soup)
+    for k, v in zip(match_info_keys, match_info_values):
+        match_info = match_info | {k.text[:-1].lower(): v.text.replace('\xa0', ' ')}
+
+    # Odds
+    odds = {}
+    odds_data = sel.ODDS_ROW.find(soup)
+    if odds_data is not None:
+        odds_labels = sel.ODDS_TYPE.find_all(odds_data)
+        odds_values = sel.ODDS_VALUE.find_all(odds_data)
+        for k, v in zip(odds_labels, odds_values):
+            odds = odds | {k.text: float(v.text)}
+
+    data = {"tournament": tournament_info} | \
+        {"local_datetime": match_date} | \
+        {"home_team": home_team} | \
+        {"away_team": away_team} | \
+        {"score": score} | \
+        {"match_info": match_info} | \
+        {"odds": odds}
+
+    return data
+
+
+def get_summary(page):
+    soup = page_soup(page)
+
+    match_data = []
+
+    data = sel.INCIDENT.find_all(soup)
+    for i in data:
+        match_time = sel.INCIDENT_TIME.find(i).text
+
+        player_out = None
+        if sel.INCIDENT_SUB_OUT.find(i) is not None:
+            player_out = sel.INCIDENT_SUB_OUT.find(i).text
+
+        player = sel.INCIDENT_PLAYER.find(i).text
+
+        incident = None
+        if sel.INCIDENT_SUB.find(i) is not None:
+            incident = sel.INCIDENT_SUB.find(i).text.replace('(', '').replace(')', '')
+
+        assist = None
+        if sel.INCIDENT_ASSIST.find(i) is not None:
+            assist = sel.INCIDENT_ASSIST.find(i).text.replace('(', '').replace(')', '')
+
+        incident_icon = None
+        if sel.INCIDENT_ICON.find(i) is not None:
+            incident_icon = None if sel.INCIDENT_ICON.find(i).text == "" else sel.INCIDENT_ICON.find(i).text
+
+        commentary = None
+        if i.find('div', attrs={'class': ''}) is not None:
+            commentary = i.find('div', attrs={'class': ''})['title'].replace('<br>', ' ').replace('<br />', ' ').replace('\n', ' ')
+
+        # add team for each event
+        if i.find_parent('div')['class'][-1][5:].startswith('home'):
+            team = sel.HOME_TEAM.find(soup).text
+        else:
+            team = sel.AWAY_TEAM.find(soup).text
+
+        match_data.append({
+            "time": match_time,
+            "player_out": player_out,
+            "player": player,
+            "incident": incident,
+            "assist": assist,
+            "incident_icon": incident_icon,
+            "commentary": commentary,
+            "team": team
+        })
+
+    return match_data
+
+
+def get_statistics(page):
+    soup = page_soup(page, STATISTICS_STRAINER)
+
+    data = []
+    for i in sel.STAT_ROW.find_all(soup):
+        stats_name = sel.STAT_CATEGORY.find(i).text
+        values = sel.STAT_VALUE.find_all(i)
+
+        data.append({
+            "label": stats_name,
+            "home_value": values[0].text,
+            "away_value": values[1].text
+        })
+
+    # Top stats repeat some detailed rows; key each metric once by its stable ID, typed once here
+    return typed_statistics(keyed_statistics(data))
+
+
+def get_lineup(page):
+    soup = page_soup(page)
+
+    data = {}
+    data['lineup'] = {}
+
+    try:
+        data['lineup']['home_team_formation'] = sel.FORMATION.find_all(soup)[0].text
+        data['lineup']['away_team_formation'] = sel.FORMATION.find_all(soup)[2].text
+    except:
+        pass
+
+    data['lineup']['home_team'] = []
+    data['lineup']['away_team'] = []
+
+    sections = sel.LINEUP.find(soup)
+    if sections is None:
+        return data
+
+    for section in sections:
+        header = sel.LINEUP_HEADER.find(section)
+        if header is None:
+            continue
+        sides = sel.LINEUP_SIDE.find_all(section)
+        if not sides:
+            continue
+
+        for side, players in (('home_team', sides[0]), ('away_team', sides[-1])):
+            for player in players:
+                player_dict = {}
+
+                if header.text == "Starting Lineups":
+                    player_dict['jersey'] = int(sel.JERSEY.find(player).text)
+                    player_dict['nationality'] = sel.NATIONALITY.find(player)["alt"]
+                    player_dict['name'] = sel.PLAYER_LINK.find(player).text
+                    player_dict['status'] = "lineup"
+                elif header.text == "Substituted players":
+                    player_dict['name'] = sel.PLAYER_LINK.find(player).text
+                    try:
+                        player_dict['rating'] = float(sel.RATING.find_all(player)[-1].text)
+                    except:
+                        pass
+                    player_dict['status'] = "Substituted player"
+                elif header.text == "Substitutes":
+                    player_dict['jersey'] = int(sel.JERSEY.find(player).text)
+                    player_dict['nationality'] = sel.NATIONALITY.find(player)["alt"]
+                    player_dict['name'] = sel.PLAYER_LINK.find(player).text
+                    player_dict['status'] = "Substitutes"
+                elif header.text == "Missing Players":
+                    player_dict['nationality'] = sel.NATIONALITY.find(player)["alt"]
+                    player_dict['name'] = sel.PLAYER_LINK.find(player).text
+                    player_dict['status'] = sel.MISSING_REASON.find(player).text
+                elif header.text == "Coaches":
+                    player_dict['nationality'] = sel.COACH_NATIONALITY.find(player)["alt"]
+                    player_dict['name'] = sel.PLAYER_LINK.find(player).text
+                    player_dict['status'] = "coach"
+                else:
+                    continue
+
+                data['lineup'][side].append(player_dict)
+
+    return data
+
+
+def get_commentary(page):
+    soup = page_soup(page, COMMENTARY_STRAINER)
+
+    comments = []
+
+    for event in sel.COMMENT.find_all(soup):
+        try:
+            minute = sel.COMMENT_MINUTE.find(event).text.replace("'", "")
+        except:
+            minute = '0'
+
+        comment = None
+        for selector in sel.COMMENT_TEXTS:
+            element = selector.find(event)
+            if element is not None:
+                comment = element.text
+
+        comments.append((minute, comment))
+
+    # The tab lists the newest comment first
+    comments.reverse()
+    return comments
+
+
+def get_report(page):
+    soup = page_soup(page)
+
+    ps = sel.REPORT.find(soup)
+    return ps.text.strip().split('\n')[-1].split(': ')[-1]
+
+
+def open_tab(driver, href, ready_selector, optional, replaces_content=False):
+    """Click a match page tab by its href and return once its content is rendered"""
+    # Extra time, commentary and report tabs are often missing; don't sit out the implicit wait
+    xpath = f"//a[@href='{href}']"
+    if href in OPTIONAL_TABS and optional.find(By.XPATH, xpath) is None:
+        raise NoSuchElementException(f"Tab {href} not present")
+
+    # Statistics periods reuse the same selector, so wait for the old rows to go away first
+    previous = driver.execute_script("return document.querySelector(arguments[0])", ready_selector) \
+        if replaces_content else None
+
+    WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.XPATH, xpath))
+    ).click()
+
+    wait_for_stale(driver, previous)
+    if wait_for_selector(driver, ready_selector, timeout=10) is None:
+        raise TimeoutException(f"Tab {href} did not render {ready_selector}")
+
+
+def parse_match(match_id, open_page):
+    """Run every tab parser; open_page(href, ready_selector, replaces_content) supplies each tab's page"""
+    match_data = {'id': match_id}
+
+    # Get match info
+    try:
+        page = open_page(SUMMARY_TAB, sel.START_TIME.css)
+        # Events need the full tree; building it first lets the header lookups reuse it
+        events = get_summary(page)
+        match_data = match_data | get_match_info(page)
+        match_data['events'] = events
+    except Exception as e:
+        logger.error(f"Error getting match info for {match_id}: {e}")
+
+    # Get statistics
+    match_data['statistics'] = {}
+    for period, suffix in STATISTICS_PERIODS.items():
+        try:
+            page = open_page(f'#/match-summary/match-statistics{suffix}', sel.STAT_ROW.css, replaces_content=True)
+            match_data['statistics'][period] = get_statistics(page)
+        except (TimeoutException, NoSuchElementException):
+            if period != 'extra_time':
+                logger.warning(f"Statistics not found for {period} of {match_id}")
+
+    # Get lineup
+    try:
+        page = open_page('#/match-summary/lineups', sel.LINEUP.css)
+        match_data = match_data | get_lineup(page)
+    except Exception as e:
+        logger.error(f"Error getting lineup for {match_id}: {e}")
+
+    # Get commentary
+    try:
+        page = open_page('#/match-summary/live-commentary', sel.COMMENT.css)
+        match_data['commentary'] = get_commentary(page)
+    except Exception as e:
+        logger.warning(f"Commentary not available for {match_id}: {e}")
+
+    # Get match report
+    try:
+        page = open_page('#/report', sel.REPORT.css)
+        match_data['man_of_the_match'] = get_report(page)
+    except Exception as e:
+        logger.warning(f"Match report not available for {match_id}: {e}")
+
+    return match_data
+
+
+def scrape_match(driver, match_id, limiter=None, cache=None):
+    """Scrape info, events, statistics, lineup, commentary and report for one match"""
+    if limiter:
+        limiter.wait()
+
+    driver.get(MATCH_URL.format(match_id=match_id) + '#match-summary')
+    if wait_for_selector(driver, sel.DUEL.css) is None and is_blocked(body=driver.page_source):
+        if limiter:
+            limiter.backoff()
+        raise TimeoutException(f"Blocked page for {match_id}")
+
+    # Consent is primed once per pooled driver; this only clicks if the banner came back
+    accept_consent(driver)
+
+    optional = OptionalLookup(driver)
+    optional.start_page(match_id)
+
+    def open_page(href, ready_selector, replaces_content=False):
+        open_tab(driver, href, ready_selector, optional, replaces_content)
+        # One page_source read and one parse per tab, shared by every parser that runs on it
+        if cache is None:
+            return ParsedPage(driver.page_source)
+        return cache.snapshot(driver, tab_url(match_id, href))
+
+    match_data = parse_match(match_id, open_page)
+    optional.report()
+    return match_data
+
+
+def cached_match_fresh(cache, match_id):
+    """Whether every tab snapshot of a match is still fresh, so replaying it gives what a scrape would"""
+    urls = cache.urls(MATCH_URL.format(match_id=match_id))
+    if tab_url(match_id, SUMMARY_TAB) not in urls:
+        return False
+    # Tabs a scrape found missing were never cached; a live tab may expire while the summary is fresh
+    return all(cache.fresh(url) for url in urls)
+
+
+def replay_match(cache, match_id):
+    """Re-run all parsers over cached tab snapshots, without a browser or network"""
+    def open_page(href, ready_selector, replaces_content=False):
+        try:
+            return ParsedPage(cache.load(tab_url(match_id, href)))
+        except CacheMiss:
+            raise NoSuchElementException(f"Tab {href} not cached")
+
+    return parse_match(match_id, open_page)
+
+
+def worker(pool, work_queue, writer, limiter, cache=None):
+    """Claim match IDs from the work queue until none are left"""
+    while True:
+        claimed = work_queue.claim(MATCH)
+        if not claimed:
+            return
+        match_id = claimed[0]
+
+        counts = work_queue.counts(MATCH)
+        logger.info(f'Processing match {match_id} ({counts[DONE] + 1}/{sum(counts.values())})')
+        try:
+            # Finished matches never expire, so they replay for good; live ones only while every tab is fresh
+            if cache is not None and cached_match_fresh(cache, match_id):
+                record = replay_match(cache, match_id)
+            else:
+                # Pool size equals worker count, so each worker keeps getting its own warm driver back
+                with pool.driver() as driver:
+                    record = scrape_match(driver, match_id, limiter, cache)
+            writer.write(record)
+            work_queue.complete(match_id, MATCH)
+        except Exception as e:
+            logger.error(f"Error processing match {match_id}: {e}")
+            work_queue.fail(match_id, str(e), MATCH)
+
+
+def scrape_matches(match_ids, output_base, workers=WORKERS, requests_per_second=REQUESTS_PER_SECOND, cache=None,
+                   output_format="json", work_queue=None, digests=None):
+    """Scrape match details with a bounded number of parallel drivers; digests drops unchanged records"""
+    # A resumed run adds to the file the earlier run started
+    append = work_queue is not None
+    # Without a durable queue, an in-memory one still gives the workers a shared claim list
+    work_queue = work_queue or WorkQueue(":memory:")
+    work_queue.add(match_ids, MATCH)
+    counts = work_queue.counts(MATCH)
+    logger.info(f"Work queue: {counts}")
+    remaining = counts[PENDING] + counts[IN_FLIGHT]
+    if not remaining:
+        logger.info("Nothing left to scrape")
+        return 0
+
+    workers = max(1, min(workers, remaining))
+    limiter = for_host(MATCH_URL, requests_per_second)
+    writer = open_writer(output_base, output_format, append=append)
+    if digests is not None:
+        writer = ChangeFilter(writer, digests, "match_details")
+
+    try:
+        with DriverPool(size=workers, profile_root=PROFILE_ROOT) as pool:
+            threads = [
+                threading.Thread(
+                    target=worker,
+                    args=(pool, work_queue, writer, limiter, cache),
+                    name=f"worker-{n}"
+                )
+                for n in range(workers)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        writer.close()
+
+    logger.info(f"Saved {writer.count} matches to {writer.output_file}; queue now {work_queue.counts(MATCH)}")
+    logger.info(f"Rate limiter: {limiter.stats()}")
+    return writer.count
+
+
+def replay_matches(match_ids, output_base, cache, output_format="json"):
+    """Reparse cached matches into a daily file; a full season takes seconds"""
+    writer = open_writer(output_base, output_format)
+    try:
+        for match_id in match_ids:
+            try:
+                writer.write(replay_match(cache, match_id))
+            except Exception as e:
+                logger.error(f"Error replaying match {match_id}: {e}")
+    finally:
+        writer.close()
+
+    cache.log_summary()
+    logger.info(f"Replayed {writer.count} matches to {writer.output_file}")
+    return writer.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Flashscore match details for a list of match IDs")
+    parser.add_argument("--input", type=str, default=INPUT_FILE, help="File with one match ID per line")
+    parser.add_argument("--output-dir", type=str, default=OUTPUT_DIR, help="Directory for the daily output")
+    parser.add_argument("--format", type=str, default="json", choices=OUTPUT_FORMATS,
+                        help="Pretty JSON array, or append-only JSON Lines (optionally zstd-compressed)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Number of parallel drivers")
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND, help="Global page loads per second")
+    parser.add_argument("--cache-dir", type=str, help=f"Cache tab snapshots here (replay default: {CACHE_DIR})")
+    parser.add_argument("--replay", action="store_true", help="Re-run the parsers from the page cache only")
+    parser.add_argument("--queue", type=str, default=QUEUE_FILE,
+                        help="SQLite work queue; finished matches are skipped on later runs ('' for none)")
+    parser.add_argument("--changes-only", action="store_true",
+                        help="Write only matches that are new or differ from their last scrape")
+    parser.add_argument("--digests", type=str, default=DIGEST_FILE, help="Last-seen content hash index")
+    args = parser.parse_args()
+
+    try:
+        match_ids = read_match_ids(args.input)
+        yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
+        os.makedirs(args.output_dir, exist_ok=True)
+        output_base = os.path.join(args.output_dir, f"{yesterday.date()}")
+
+        if args.replay:
+            replay_matches(match_ids, output_base, PageCache(args.cache_dir or CACHE_DIR, replay=True), args.format)
+        else:
+            cache = PageCache(args.cache_dir) if args.cache_dir else None
+            work_queue = WorkQueue(args.queue) if args.queue else None
+            digests = DigestIndex(args.digests) if args.changes_only else None
+            scrape_matches(match_ids, output_base, args.workers, args.rate, cache, args.format, work_queue, digests)
+    except Exception as e:
+        logger.error(f"Fatal error: {e}")
+
+
+if __name__ == "__main__":
+    main()
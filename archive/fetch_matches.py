@@ -2,16 +2,17 @@
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime, timedelta
-import time
 import logging
 import os
 
+from consent import BANNER_WAIT, accept_consent
+from rate_limit import is_blocked
+from waits import wait_for_selector
+from work_queue import DATE, MATCH, QUEUE_FILE, WorkQueue
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -37,12 +38,17 @@ def setup_driver():
         logger.error(f"Failed to initialize Chrome driver: {e}")
         raise
 
-def get_match_ids(date_str):
+def get_match_ids(date_str, driver=None, work_queue=None):
     """
     Fetch match IDs from Flashscore for a specific date
     date_str: date in format YYYYMMDD
+    driver: optional driver from a DriverPool, left open when given
+    work_queue: optional WorkQueue the IDs are added to for fetch_match_details.py
+    Returns None when the page could not be read, as opposed to an empty list for a day without matches
     """
-    driver = setup_driver()
+    owns_driver = driver is None
+    if owns_driver:
+        driver = setup_driver()
     match_ids = []
     
     try:
@@ -50,18 +56,13 @@ def get_match_ids(date_str):
         url = f"https://www.flashscore.com/football/?d={date_str}"
         logger.info(f"Fetching matches for date: {date_str}")
         driver.get(url)
-        time.sleep(2)
 
-        # Accept GDPR if present
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-            ).click()
-        except (TimeoutException, NoSuchElementException):
-            pass
+        # Accept GDPR if present; pooled drivers were primed, our own may get the banner late
+        accept_consent(driver, banner_wait=BANNER_WAIT if owns_driver else 0)
 
-        # Wait for matches to load
-        time.sleep(2)
+        # Wait for the first match row to appear; a block page has none either but is not an empty day
+        if wait_for_selector(driver, ".event__match") is None and is_blocked(body=driver.page_source):
+            raise RuntimeError(f"Blocked on {url}")
 
         # Find all match elements
         matches = driver.find_elements(By.CLASS_NAME, "event__match")
@@ -85,23 +86,42 @@ def get_match_ids(date_str):
                 f.write(f"{match_id}\n")
         
         logger.info(f"Saved match IDs to {output_file}")
+
+        if work_queue is not None:
+            added = work_queue.add(match_ids, MATCH)
+            logger.info(f"Queued {added} new match IDs")
         
         return match_ids
 
     except Exception as e:
         logger.error(f"Error fetching match IDs: {e}")
-        return []
+        return None
     
     finally:
-        driver.quit()
+        if owns_driver:
+            driver.quit()
 
 def main():
     # Get yesterday's date in YYYYMMDD format
     yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")
     
     try:
-        match_ids = get_match_ids(yesterday)
-        print(f"Found {len(match_ids)} matches for {yesterday}")
+        # Dates are queued too, so a day missed by a crashed or failed run is picked up by the next one
+        work_queue = WorkQueue(QUEUE_FILE)
+        work_queue.add([yesterday], DATE)
+        while True:
+            claimed = work_queue.claim(DATE)
+            if not claimed:
+                break
+            date_str = claimed[0]
+            match_ids = get_match_ids(date_str, work_queue=work_queue)
+            # A day without matches is done; only a failed fetch is tried again
+            if match_ids is not None:
+                work_queue.complete(date_str, DATE)
+                print(f"Found {len(match_ids)} matches for {date_str}")
+            else:
+                work_queue.fail(date_str, "fetching match IDs failed", DATE)
+        work_queue.close()
     except Exception as e:
         logger.error(f"Script failed: {e}")
 
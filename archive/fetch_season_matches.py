@@ -5,14 +5,25 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException, StaleElementReferenceException
+from selenium.common.exceptions import WebDriverException, StaleElementReferenceException
 from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime, timedelta
-import time
+import argparse
 import logging
 import os
-import json
-import random
+
+import flashscore_selectors as sel
+from consent import accept_consent
+from driver_pool import DriverPool
+from output_writers import JsonlWriter
+from resource_blocking import enable_performance_logging
+from rate_limit import for_host, is_blocked
+from retry_policy import BlockedPage, CircuitOpen, RetryPolicy
+from stat_labels import keyed_statistics
+from stat_values import typed_statistics
+from row_extractor import extract_match_rows, is_complete, row_statistics
+from waits import wait_for_dom_ready, wait_for_selector
+from watermarks import TRAILING_DAYS, WATERMARK_FILE, Watermarks, row_date
 
 # Set up logging
 logging.basicConfig(
@@ -25,8 +36,15 @@ logger = logging.getLogger(__name__)
 # Constants
 WAIT_TIME = 30  # Increased wait time
 PAGE_LOAD_TIMEOUT = 40
-RETRY_ATTEMPTS = 5
-RETRY_DELAY = 10
+REQUESTS_PER_SECOND = 0.5
+OUTPUT_DIR = os.path.join("data", "leagues")
+SEASON_START = "2024-08-01"  # Typical season start
+SEASON_END = "2025-05-31"    # Typical season end
+BASE_URL = "https://www.flashscore.com"
+
+def flashscore_limiter():
+    """Politeness pacing for page loads, shared with other Flashscore scrapers; created on first use, not at import"""
+    return for_host(BASE_URL, REQUESTS_PER_SECOND)
 
 def setup_driver():
     """Setup and return configured Chrome WebDriver"""
@@ -42,6 +60,7 @@ def setup_driver():
     options.add_argument('--disable-infobars')
     options.add_experimental_option('excludeSwitches', ['enable-automation'])
     options.add_experimental_option('useAutomationExtension', False)
+    enable_performance_logging(options)
     
     try:
         service = ChromeService(ChromeDriverManager().install())
@@ -58,33 +77,21 @@ def setup_driver():
         raise
 
 def handle_gdpr_consent(driver):
-    """Handle GDPR consent popup if present"""
-    try:
-        consent_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-        )
-        driver.execute_script("arguments[0].click();", consent_button)
-        time.sleep(2)
-    except (TimeoutException, NoSuchElementException):
+    """Handle GDPR consent popup if present, without blocking when it is not"""
+    if not accept_consent(driver):
         logger.info("No GDPR consent button found or already accepted")
-        pass
 
 def wait_for_load(driver):
-    """Wait for page to load completely"""
-    time.sleep(random.uniform(2, 4))  # Random delay to appear more human-like
-    try:
-        WebDriverWait(driver, WAIT_TIME).until(
-            lambda d: d.execute_script('return document.readyState') == 'complete'
-        )
-    except:
-        pass
+    """Wait until the document is ready, returning as soon as it is"""
+    wait_for_dom_ready(driver, WAIT_TIME)
 
-def get_match_details(driver, match_id):
+def get_match_details(driver, match_id, limiter=None):
     """Get detailed statistics for a specific match"""
     try:
-        url = f"https://www.flashscore.com/match/{match_id}/#/match-summary/match-statistics"
+        url = f"{BASE_URL}/match/{match_id}/#/match-summary/match-statistics"
         logger.info(f"Getting details for match: {match_id}")
         
+        (limiter or flashscore_limiter()).wait()
         driver.get(url)
         wait_for_load(driver)
         
@@ -119,17 +126,21 @@ def get_match_details(driver, match_id):
         # Get statistics
         try:
             stats_elements = driver.find_elements(By.CLASS_NAME, "stat__row")
+            rows = []
             for stat in stats_elements:
                 try:
                     stat_name = stat.find_element(By.CLASS_NAME, "stat__categoryName").text
                     stat_values = stat.find_elements(By.CLASS_NAME, "stat__value")
-                    match_data["statistics"][stat_name] = {
-                        "home": stat_values[0].text if len(stat_values) > 0 else None,
-                        "away": stat_values[1].text if len(stat_values) > 1 else None
-                    }
+                    rows.append({
+                        "label": stat_name,
+                        "home_value": stat_values[0].text if len(stat_values) > 0 else None,
+                        "away_value": stat_values[1].text if len(stat_values) > 1 else None
+                    })
                 except Exception as e:
                     logger.error(f"Error processing statistic: {e}")
                     continue
+            # Same keyed {label, home_value, away_value} rows as fetch_match_details.get_statistics
+            match_data["statistics"] = typed_statistics(keyed_statistics(rows))
         except Exception as e:
             logger.error(f"Error getting match statistics: {e}")
         
@@ -139,163 +150,126 @@ def get_match_details(driver, match_id):
         logger.error(f"Error getting match details: {e}")
         return None
 
-def save_match_details(match_details, output_dir="data/matches"):
-    """Save detailed match information to JSON files"""
+def restart_driver(driver):
+    """Replace a dead standalone driver with a new one"""
     try:
-        os.makedirs(output_dir, exist_ok=True)
-        
-        for match in match_details:
-            if match and "id" in match:
-                league_name = match.get("league", "unknown")
-                league_dir = os.path.join(output_dir, league_name)
-                os.makedirs(league_dir, exist_ok=True)
-                
-                output_file = os.path.join(league_dir, f"{match['id']}.json")
-                with open(output_file, "w", encoding="utf-8") as f:
-                    json.dump(match, f, indent=2, ensure_ascii=False)
-                logger.info(f"Saved match details to {output_file}")
-                
-    except Exception as e:
-        logger.error(f"Error saving match details: {e}")
+        driver.quit()
+    except Exception:
+        pass
+    return setup_driver()
 
-def get_league_matches(driver, league_url, start_date, end_date):
-    """Fetch match data directly from league results page"""
+def fetch_date(driver, league_url, current_date, end_date, writer=None, limiter=None):
+    """Load the results page and return one date's finished matches, streaming each to writer if given"""
     matches_data = []
-    current_date = start_date
     league_name = league_url.split("/")[-1]
+    date_str = current_date.strftime("%Y%m%d")
+    url = f"{league_url}/results/"
+    logger.info(f"Fetching matches for {league_url} on date: {date_str}")
     
-    while current_date <= end_date:
-        attempts = 0
-        while attempts < RETRY_ATTEMPTS:
-            try:
-                date_str = current_date.strftime("%Y%m%d")
-                url = f"{league_url}/results/"
-                logger.info(f"Fetching matches for {league_url} on date: {date_str}")
-                
-                driver.get(url)
-                wait_for_load(driver)
-                
-                # Handle GDPR
-                handle_gdpr_consent(driver)
-                
-                # Wait for matches container to load
-                try:
-                    WebDriverWait(driver, WAIT_TIME).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "sportName soccer"))
-                    )
-                except TimeoutException:
-                    logger.info(f"No matches found for date {date_str}")
-                    break
+    (limiter or flashscore_limiter()).wait()
+    driver.get(url)
+    wait_for_load(driver)
+    
+    # Handle GDPR
+    handle_gdpr_consent(driver)
+    
+    # Wait for the first match row instead of a fixed delay
+    if not wait_for_selector(driver, sel.SOCCER_MATCH_ROWS_CSS, WAIT_TIME):
+        # A block page has no rows either, but must not count as an empty date
+        if is_blocked(body=driver.page_source):
+            raise BlockedPage(f"Blocked on {url}")
+        logger.info(f"No matches found for date {date_str}")
+        return matches_data
 
-                # Get all match rows
-                match_rows = driver.find_elements(By.CLASS_NAME, "event__match")
-                
-                for match_row in match_rows:
-                    try:
-                        # Extract match date
-                        match_date = match_row.find_element(By.CLASS_NAME, "event__time").text
-                        
-                        # Extract teams
-                        home_team = match_row.find_element(By.CLASS_NAME, "event__participant--home").text
-                        away_team = match_row.find_element(By.CLASS_NAME, "event__participant--away").text
-                        
-                        # Extract score
-                        home_score = match_row.find_element(By.CLASS_NAME, "event__score--home").text
-                        away_score = match_row.find_element(By.CLASS_NAME, "event__score--away").text
-                        
-                        match_data = {
-                            "date": match_date,
-                            "league": league_name,
-                            "home_team": home_team,
-                            "away_team": away_team,
-                            "score": {
-                                "home": home_score,
-                                "away": away_score
-                            }
-                        }
-                        
-                        # Get additional statistics from the page directly
-                        try:
-                            stats = {
-                                "possession": match_row.find_elements(By.CLASS_NAME, "event__possession"),
-                                "cards": match_row.find_elements(By.CLASS_NAME, "event__card"),
-                                "corners": match_row.find_elements(By.CLASS_NAME, "event__corner")
-                            }
-                            
-                            if stats["possession"]:
-                                match_data["possession"] = {
-                                    "home": stats["possession"][0].text if len(stats["possession"]) > 0 else None,
-                                    "away": stats["possession"][1].text if len(stats["possession"]) > 1 else None
-                                }
-                            
-                            if stats["cards"]:
-                                match_data["cards"] = {
-                                    "home": len([c for c in stats["cards"] if "event__card--home" in c.get_attribute("class")]),
-                                    "away": len([c for c in stats["cards"] if "event__card--away" in c.get_attribute("class")])
-                                }
-                            
-                            if stats["corners"]:
-                                match_data["corners"] = {
-                                    "home": len([c for c in stats["corners"] if "event__corner--home" in c.get_attribute("class")]),
-                                    "away": len([c for c in stats["corners"] if "event__corner--away" in c.get_attribute("class")])
-                                }
-                        except Exception as e:
-                            logger.warning(f"Could not extract additional statistics: {e}")
-                        
-                        matches_data.append(match_data)
-                        logger.info(f"Processed match: {home_team} vs {away_team}")
-                        
-                    except Exception as e:
-                        logger.error(f"Error extracting match row data: {e}")
-                        continue
+    # Get all match rows, every field in one execute_script round trip
+    match_rows = extract_match_rows(driver)
+    
+    for match_row in match_rows:
+        try:
+            if not is_complete(match_row):
+                continue
+            # The results page lists the whole season; keep only this date's rows
+            day = row_date(match_row["date"], end_date.date())
+            if day is not None and day != current_date.date():
+                continue
+            home_team = match_row["home_team"]
+            away_team = match_row["away_team"]
+            
+            match_data = {
+                "id": match_row["id"].split("_")[-1] if match_row.get("id") else None,
+                "date": match_row["date"],
+                "league": league_name,
+                "home_team": home_team,
+                "away_team": away_team,
+                "score": {
+                    "home": match_row["home_score"],
+                    "away": match_row["away_score"]
+                }
+            }
+            
+            # Add possession, cards and corners when the row shows them
+            match_data.update(row_statistics(match_row))
+            
+            matches_data.append(match_data)
+            if writer is not None:
+                writer.write(match_data)
+            logger.info(f"Processed match: {home_team} vs {away_team}")
+            
+        except Exception as e:
+            logger.error(f"Error extracting match row data: {e}")
+            continue
 
-                # Add small delay between pages
-                time.sleep(random.uniform(1, 2))
-                break  # Success - exit retry loop
+    return matches_data
 
-            except Exception as e:
-                attempts += 1
-                logger.error(f"Attempt {attempts} failed for date {current_date}: {e}")
-                if attempts < RETRY_ATTEMPTS:
-                    time.sleep(RETRY_DELAY)
-                    try:
-                        driver.refresh()
-                        wait_for_load(driver)
-                    except:
-                        driver.quit()
-                        driver = setup_driver()
-                else:
-                    logger.error(f"Failed to fetch matches for date {current_date} after {RETRY_ATTEMPTS} attempts")
+def get_league_matches(driver, league_url, start_date, end_date, writer=None, watermarks=None, restart=restart_driver,
+                       retry_policy=None):
+    """
+    Fetch match data directly from league results page, streaming each match to writer if given
+    watermarks: optional Watermarks, advanced past every date fetched without a gap
+    restart: replaces a crashed driver, e.g. DriverPool.restart for pooled drivers
+    retry_policy: pass one RetryPolicy for every league so its circuit breakers see the whole run
+    """
+    retry_policy = retry_policy or RetryPolicy(flashscore_limiter())
+    matches_data = []
+    current_date = start_date
+    league_name = league_url.split("/")[-1]
+    gap = False  # Once a date fails, the watermark must stay before it
+    
+    while current_date <= end_date:
+        date_done = False
+        try:
+            # Stale rows are re-read, timeouts reloaded, dead browsers replaced and block pages slow everyone down
+            matches, driver = retry_policy.run(
+                lambda d: fetch_date(d, league_url, current_date, end_date, writer, retry_policy.limiter), driver, restart,
+                navigates=True
+            )
+            matches_data.extend(matches)
+            date_done = True
+        except CircuitOpen as e:
+            # The site is degraded; the watermark keeps this date for the next run
+            logger.error(f"Stopping {league_name} at {current_date.date()}: {e}")
+            break
+        except Exception as e:
+            logger.error(f"Failed to fetch matches for date {current_date}: {e}")
         
+        gap = gap or not date_done
+        if watermarks is not None and not gap:
+            watermarks.advance(league_name, current_date.date())
         current_date += timedelta(days=1)
     
     return matches_data
 
-def save_matches(matches, output_dir="data/leagues"):
-    """Save matches to JSON files organized by league"""
-    try:
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Group matches by league
-        leagues = {}
-        for match in matches:
-            league = match["league"]
-            if league not in leagues:
-                leagues[league] = []
-            leagues[league].append(match)
-        
-        # Save each league's matches to a separate file
-        for league, league_matches in leagues.items():
-            output_file = os.path.join(output_dir, f"{league}.json")
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(league_matches, f, indent=2, ensure_ascii=False)
-            logger.info(f"Saved {len(league_matches)} matches for {league} to {output_file}")
-            
-    except Exception as e:
-        logger.error(f"Error saving matches: {e}")
-
 def main():
+    parser = argparse.ArgumentParser(description="Scrape league results day by day")
+    parser.add_argument("--start", type=str, default=SEASON_START, help="First date, YYYY-MM-DD")
+    parser.add_argument("--end", type=str, default=SEASON_END, help="Last date, YYYY-MM-DD")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only fetch dates after each league's watermark, up to today")
+    parser.add_argument("--trailing-days", type=int, default=TRAILING_DAYS,
+                        help="Days before the watermark to re-read for postponed or late results")
+    parser.add_argument("--watermarks", type=str, default=WATERMARK_FILE, help="Watermark file")
+    args = parser.parse_args()
+
     # List of major leagues to scrape with their identifiers
     leagues = [
         "https://www.flashscore.com/football/england/premier-league",
@@ -308,43 +282,45 @@ def main():
     ]
     
     try:
-        # Set default date range for 2024/2025 season
-        start_date = "2024-08-01"  # Typical season start
-        end_date = "2025-05-31"    # Typical season end
+        start_date = datetime.strptime(args.start, "%Y-%m-%d")
+        end_date = datetime.strptime(args.end, "%Y-%m-%d")
+        if args.incremental:
+            end_date = min(end_date, datetime.combine(datetime.now().date(), datetime.min.time()))
         
-        logger.info(f"Scraping season 2024/2025 from {start_date} to {end_date}")
+        logger.info(f"Scraping from {start_date.date()} to {end_date.date()}{' (incremental)' if args.incremental else ''}")
         
-        start_date = datetime.strptime(start_date, "%Y-%m-%d")
-        end_date = datetime.strptime(end_date, "%Y-%m-%d")
+        watermarks = Watermarks(args.watermarks)
+        total_matches = 0
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
         
-        all_matches = []
+        # Shared by every league so its circuit breakers see the whole run
+        retry_policy = RetryPolicy(flashscore_limiter())
         
-        for league_url in leagues:
-            driver = None
-            try:
-                driver = setup_driver()  # Create new driver for each league
-                logger.info(f"Processing league: {league_url}")
-                matches = get_league_matches(driver, league_url, start_date, end_date)
-                all_matches.extend(matches)
-                
-                # Save match details for this league
-                save_match_details(matches)
-                
-                # Add a delay between leagues to avoid rate limiting
-                time.sleep(random.uniform(3, 5))
-            except Exception as e:
-                logger.error(f"Error processing league {league_url}: {e}")
-            finally:
-                if driver:
-                    try:
-                        driver.quit()
-                    except:
-                        pass
+        # Warm up the driver once and share it across leagues
+        with DriverPool(size=1, factory=setup_driver) as pool:
+            for league_url in leagues:
+                try:
+                    league_name = league_url.split("/")[-1]
+                    league_start = start_date
+                    if args.incremental:
+                        league_start = datetime.combine(
+                            watermarks.start_date(league_name, start_date.date(), args.trailing_days),
+                            datetime.min.time()
+                        )
+                    output_file = os.path.join(OUTPUT_DIR, f"{league_name}.jsonl")
+                    # Matches are appended as they are read, so a crash keeps everything already flushed.
+                    # Re-read trailing days append newer copies; output_writers.read_latest keeps the last one per id.
+                    with JsonlWriter(output_file) as writer, pool.driver() as driver:
+                        logger.info(f"Processing league: {league_url} from {league_start.date()}")
+                        get_league_matches(driver, league_url, league_start, end_date, writer, watermarks, pool.restart,
+                                           retry_policy)
+                    total_matches += writer.count
+                    logger.info(f"Saved {writer.count} matches for {league_name} to {output_file}")
+                except Exception as e:
+                    logger.error(f"Error processing league {league_url}: {e}")
         
-        # Save overview of all matches
-        if all_matches:
-            save_matches(all_matches)
-            logger.info(f"Successfully processed {len(all_matches)} matches across {len(leagues)} leagues")
+        if total_matches:
+            logger.info(f"Successfully processed {total_matches} matches across {len(leagues)} leagues")
         else:
             logger.warning("No matches were found for the specified date range")
             
@@ -5,10 +5,16 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import time
-import json
 import os
 import logging
 
+from consent import BANNER_WAIT, accept_consent
+from output_writers import JsonlWriter
+from rate_limit import for_host
+from stat_labels import keyed_statistics
+from stat_values import typed_statistics
+from waits import OptionalLookup, wait_for_dom_ready, wait_for_selector
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,8 +26,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Constants
+REQUESTS_PER_SECOND = 0.5
+
 class FlashscoreScraper:
     def __init__(self):
+        self.limiter = for_host("https://www.flashscore.com", REQUESTS_PER_SECOND)
         self.setup_driver()
         
     def setup_driver(self):
@@ -39,6 +49,7 @@ class FlashscoreScraper:
             service = ChromeService(executable_path=chromedriver_path)
             self.driver = webdriver.Chrome(service=service, options=options)
             self.wait = WebDriverWait(self.driver, 20)
+            self.optional = OptionalLookup(self.driver)
             logger.info("Chrome WebDriver initialized successfully")
             
         except Exception as e:
@@ -47,14 +58,9 @@ class FlashscoreScraper:
             
     def handle_consent(self):
         """Handle GDPR consent if present"""
-        try:
-            consent_button = self.wait.until(
-                EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-            )
-            consent_button.click()
-            time.sleep(2)
+        if accept_consent(self.driver, banner_wait=BANNER_WAIT):
             logger.info("Handled GDPR consent")
-        except TimeoutException:
+        else:
             logger.info("No consent popup found or already accepted")
             
     def get_match_ids(self, date_str):
@@ -63,8 +69,9 @@ class FlashscoreScraper:
             url = f"https://www.flashscore.com/football/?d={date_str}"
             logger.info(f"Accessing matches for date: {date_str}")
             
+            self.limiter.wait()
             self.driver.get(url)
-            time.sleep(5)  # Increased wait time
+            wait_for_dom_ready(self.driver)
             
             self.handle_consent()
             
@@ -81,6 +88,7 @@ class FlashscoreScraper:
             # Get tournament sections
             tournament_sections = self.driver.find_elements(By.CLASS_NAME, "tournament")
             match_ids = []
+            self.optional.start_page(url)
             
             for section in tournament_sections:
                 try:
@@ -100,12 +108,12 @@ class FlashscoreScraper:
                             team_names = [team.text for team in teams if team.text]
                             
                             # Get match time/status
-                            time_element = match.find_elements(By.CLASS_NAME, "event__time")
+                            time_element = self.optional.find_all(By.CLASS_NAME, "event__time", match)
                             match_time = time_element[0].text if time_element else None
                             
-                            # Get score if available
-                            score_elements = match.find_elements(By.CLASS_NAME, "event__score--home") + \
-                                          match.find_elements(By.CLASS_NAME, "event__score--away")
+                            # Get score if available; not-started matches have none
+                            score_elements = self.optional.find_all(By.CLASS_NAME, "event__score--home", match) + \
+                                          self.optional.find_all(By.CLASS_NAME, "event__score--away", match)
                             score = " - ".join([s.text for s in score_elements]) if score_elements else None
                             
                             match_data = {
@@ -125,6 +133,7 @@ class FlashscoreScraper:
                     logger.error(f"Error processing tournament section: {e}")
                     continue
                     
+            self.optional.report()
             return match_ids
             
         except Exception as e:
@@ -137,8 +146,8 @@ class FlashscoreScraper:
             url = f"https://www.flashscore.com/match/{match_id}/#/match-summary"
             logger.info(f"Getting details for match: {match_id}")
             
+            self.limiter.wait()
             self.driver.get(url)
-            time.sleep(3)
             
             # Wait for match info to load
             self.wait.until(
@@ -166,23 +175,26 @@ class FlashscoreScraper:
                     EC.element_to_be_clickable((By.XPATH, "//a[@href='#/match-summary/match-statistics']"))
                 )
                 stats_button.click()
-                time.sleep(2)
+                wait_for_selector(self.driver, ".wcl-statistics", timeout=10)
                 
                 stats_elements = self.driver.find_elements(By.CLASS_NAME, "wcl-statistics")
-                match_data["statistics"] = []
+                rows = []
                 
                 for stat in stats_elements:
                     try:
                         stat_name = stat.find_element(By.CLASS_NAME, "wcl-statistics-category").text
                         stat_values = stat.find_elements(By.CLASS_NAME, "wcl-statistics-value")
-                        match_data["statistics"].append({
-                            "name": stat_name,
-                            "home": stat_values[0].text if len(stat_values) > 0 else None,
-                            "away": stat_values[1].text if len(stat_values) > 1 else None
+                        rows.append({
+                            "label": stat_name,
+                            "home_value": stat_values[0].text if len(stat_values) > 0 else None,
+                            "away_value": stat_values[1].text if len(stat_values) > 1 else None
                         })
                     except Exception as e:
                         logger.error(f"Error processing statistic: {e}")
                         continue
+                
+                # Keyed by stable stat ID; the detailed row replaces its top-stats copy
+                match_data["statistics"] = typed_statistics(keyed_statistics(rows))
                         
             except Exception as e:
                 logger.error(f"Error getting match statistics: {e}")
@@ -194,10 +206,11 @@ class FlashscoreScraper:
             return None
             
     def save_matches(self, matches, filename):
-        """Save match data to JSON file"""
+        """Append match data to a JSON Lines file"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(matches, f, indent=2, ensure_ascii=False)
+            with JsonlWriter(filename) as writer:
+                for match in matches:
+                    writer.write(match)
             logger.info(f"Saved {len(matches)} matches to {filename}")
         except Exception as e:
             logger.error(f"Error saving matches: {e}")
@@ -218,17 +231,14 @@ def main():
         if matches:
             logger.info(f"Found {len(matches)} matches")
             
-            # Get details for each match
-            match_details = []
-            for match in matches[:5]:  # Start with first 5 matches for testing
-                details = scraper.get_match_details(match['id'])
-                if details:
-                    match_details.append(details)
-                time.sleep(2)  # Delay between requests
-                
-            # Save results
-            if match_details:
-                scraper.save_matches(match_details, f'matches_{date_str}.json')
+            # Get details for each match, appending each one as soon as it is scraped
+            output_file = f'matches_{date_str}.jsonl'
+            with JsonlWriter(output_file) as writer:
+                for match in matches[:5]:  # Start with first 5 matches for testing
+                    details = scraper.get_match_details(match['id'])
+                    if details:
+                        writer.write(details)
+            logger.info(f"Saved {writer.count} matches to {output_file}")
                 
     except Exception as e:
         logger.error(f"Error in main: {e}")
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+
+import argparse
+import logging
+import os
+import re
+import sys
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def is_selectolax(tree) -> bool:
+    # BeautifulSoup answers any attribute lookup with a child search, so duck typing cannot tell them apart
+    return type(tree).__module__.startswith("selectolax")
+
+
+class Selector(NamedTuple):
+    """One element lookup, usable from BeautifulSoup (tag + attrs) and Selenium (css)"""
+    name: str
+    page: str                              # summary, statistics, lineups, commentary, report or results
+    tag: Optional[str]
+    attrs: Dict[str, Any]
+    css: str
+    required: bool = True                  # Optional elements (odds, assists...) are not health failures
+    fallback: Optional["Selector"] = None  # Tried when the primary lookup finds nothing
+
+    def find_primary(self, soup):
+        """This selector's own lookup, without the fallback; selectolax trees are searched by css"""
+        if is_selectolax(soup):
+            return soup.css_first(self.css)
+        return soup.find(self.tag, attrs=self.attrs)
+
+    def find(self, soup):
+        element = self.find_primary(soup)
+        if element is None and self.fallback is not None:
+            element = self.fallback.find(soup)
+        return element
+
+    def find_all(self, soup) -> list:
+        if is_selectolax(soup):
+            elements = soup.css(self.css)
+        else:
+            elements = soup.find_all(self.tag, attrs=self.attrs)
+        if not elements and self.fallback is not None:
+            elements = self.fallback.find_all(soup)
+        return elements
+
+
+# Every selector by name, for the health check
+SELECTORS: Dict[str, Selector] = {}
+
+
+def register(selector: Selector) -> Selector:
+    SELECTORS[selector.name] = selector
+    return selector
+
+
+def by_class(name, page, cls, tag='div', **kwargs) -> Selector:
+    return register(Selector(name, page, tag, {'class': cls}, f"{tag}.{cls}", **kwargs))
+
+
+def by_prefix(name, page, prefix, tag='div', **kwargs) -> Selector:
+    """Class names that start with a fixed prefix, compiled once here instead of on every call"""
+    return register(Selector(
+        name, page, tag, {'class': re.compile('^' + re.escape(prefix))},
+        f"{tag}[class^='{prefix}'], {tag}[class*=' {prefix}']", **kwargs
+    ))
+
+
+def by_testid(name, page, testid, tag='div', **kwargs) -> Selector:
+    return register(Selector(name, page, tag, {'data-testid': testid}, f"{tag}[data-testid='{testid}']", **kwargs))
+
+
+def hashed(name, page, *prefixes, tag='div') -> Selector:
+    """Build-hashed class names such as wcl-row_OFViZ, matched on the stable part before the hash"""
+    pattern = re.compile('^(' + '|'.join(re.escape(p) for p in prefixes) + r')(_[\w-]+)?$')
+    css = ", ".join(f"{tag}[class^='{p}_'], {tag}[class*=' {p}_']" for p in prefixes)
+    return register(Selector(name, page, tag, {'class': pattern}, css, required=False))
+
+
+# Match header, shared by every match tab
+DUEL = by_class('duel', 'summary', 'duelParticipant')
+TOURNAMENT = by_class('tournament', 'summary', 'tournamentHeader__country', tag='span')
+START_TIME = by_class('start_time', 'summary', 'duelParticipant__startTime')
+HOME_TEAM = by_prefix('home_team', 'summary', 'duelParticipant__home')
+AWAY_TEAM = by_prefix('away_team', 'summary', 'duelParticipant__away')
+FULL_TIME_SCORE = by_class('full_time_score', 'summary', 'detailScore__fullTime', required=False)
+FINAL_SCORE = by_class('final_score', 'summary', 'detailScore__wrapper')
+MATCH_STATUS = by_class('match_status', 'summary', 'detailScore__status')
+HALF_SCORES = by_prefix('half_scores', 'summary', 'wclHeaderSection--summary')
+INFO_LABELS = by_prefix('info_labels', 'summary', 'wcl-infoLabelWrapper')
+INFO_VALUES = by_prefix('info_values', 'summary', 'wcl-infoValue')
+ODDS_ROW = by_class('odds_row', 'summary', 'oddsRowContent', required=False)
+ODDS_TYPE = by_class('odds_type', 'summary', 'oddsType', tag='span', required=False)
+ODDS_VALUE = by_prefix('odds_value', 'summary', 'oddsValue', tag='span', required=False)
+
+# Summary incidents
+INCIDENT = by_class('incident', 'summary', 'smv__incident')
+INCIDENT_TIME = by_class('incident_time', 'summary', 'smv__timeBox')
+INCIDENT_PLAYER = by_class('incident_player', 'summary', 'smv__playerName', tag='a')
+INCIDENT_SUB_OUT = by_class('incident_sub_out', 'summary', 'smv__incidentSubOut', required=False)
+INCIDENT_SUB = by_class('incident_sub', 'summary', 'smv__subIncident', required=False)
+INCIDENT_ASSIST = by_class('incident_assist', 'summary', 'smv__assist', required=False)
+INCIDENT_ICON = by_class('incident_icon', 'summary', 'smv__incidentIcon', required=False)
+
+# Statistics tab; the data-testid hooks are stable, the hashed wcl-row/value classes are the fallback
+STAT_ROW = by_testid('stat_row', 'statistics', 'wcl-statistics',
+                     fallback=hashed('stat_row_hashed', 'statistics', 'wcl-row'))
+STAT_CATEGORY = by_testid('stat_category', 'statistics', 'wcl-statistics-category')
+STAT_VALUE = by_testid('stat_value', 'statistics', 'wcl-statistics-value',
+                       fallback=hashed('stat_value_hashed', 'statistics', 'wcl-homeValue', 'wcl-awayValue'))
+
+# Lineups tab
+LINEUP = by_class('lineup', 'lineups', 'lf__lineUp')
+LINEUP_HEADER = by_testid('lineup_header', 'lineups', 'wcl-headerSection-text')
+LINEUP_SIDE = by_class('lineup_side', 'lineups', 'lf__side')
+FORMATION = by_testid('formation', 'lineups', 'wcl-scores-overline-02', tag='span', required=False)
+JERSEY = by_testid('jersey', 'lineups', 'wcl-scores-simpleText-01', tag='span')
+NATIONALITY = by_testid('nationality', 'lineups', 'wcl-assetContainerBoxFree-XS', tag='img')
+PLAYER_LINK = by_testid('player_link', 'lineups', 'wcl-textLink', tag='a')
+RATING = by_testid('rating', 'lineups', 'wcl-scores-caption-03', tag='span', required=False)
+MISSING_REASON = by_testid('missing_reason', 'lineups', 'wcl-scores-caption-05', tag='span', required=False)
+COACH_NATIONALITY = by_prefix('coach_nationality', 'lineups', 'wcl-assetContainer', tag='img')
+
+# Commentary tab; get_commentary keeps the text of the last of these patterns that matches
+COMMENT = by_testid('comment', 'commentary', 'wcl-commentary')
+COMMENT_MINUTE = by_testid('comment_minute', 'commentary', 'wcl-scores-simpleText-02', tag='strong', required=False)
+COMMENT_TEXTS = (
+    by_prefix('comment_general', 'commentary', 'wcl-general_', required=False),
+    by_prefix('comment_highlighted', 'commentary', 'wcl-highlighted_', required=False),
+    by_prefix('comment_live', 'commentary', 'wcl-live_', required=False),
+)
+
+# Report tab
+REPORT = by_class('report', 'report', 'fsNewsArticle__content')
+
+# Results and fixture listings (get_league_matches, test_connection.py, xpath_finder.py)
+SPORT_SECTION = by_class('sport_section', 'results', 'sportName')
+MATCH_ROW = by_class('match_row', 'results', 'event__match')
+TOURNAMENT_COUNTRY = by_class('tournament_country', 'results', 'tournament__country', required=False)
+PARTICIPANT = by_class('participant', 'results', 'event__participant')
+ROW_TIME = by_class('row_time', 'results', 'event__time')
+ROW_SCORE = by_class('row_score', 'results', 'event__score')
+SOCCER_MATCH_ROWS_CSS = ".sportName.soccer .event__match"
+
+# Cached page URLs end in the tab href, which tells the health check which selectors apply
+PAGE_TYPES = (
+    ('match-statistics', 'statistics'),
+    ('/lineups', 'lineups'),
+    ('/live-commentary', 'commentary'),
+    ('#/report', 'report'),
+    ('#/match-summary', 'summary'),
+)
+HEALTH_THRESHOLD = 0.9
+
+
+def page_type(url: str) -> Optional[str]:
+    """Tab a cached URL belongs to, or None when every selector should be tried"""
+    for marker, page in PAGE_TYPES:
+        if marker in url:
+            return page
+    if '/results' in url or '/fixtures' in url:
+        return 'results'
+    return None
+
+
+class HealthReport:
+    """Per-selector hit counts over a corpus of saved pages"""
+
+    def __init__(self):
+        self.checked = Counter()
+        self.hits = Counter()
+        self.fallback_hits = Counter()
+        self.pages = 0
+
+    def check(self, soup, page: Optional[str] = None):
+        self.pages += 1
+        for selector in SELECTORS.values():
+            if page is not None and selector.page != page:
+                continue
+            self.checked[selector.name] += 1
+            if selector.find_primary(soup) is not None:
+                self.hits[selector.name] += 1
+            elif selector.fallback is not None and selector.fallback.find(soup) is not None:
+                self.fallback_hits[selector.name] += 1
+
+    def hit_rate(self, name: str) -> float:
+        return (self.hits[name] + self.fallback_hits[name]) / self.checked[name]
+
+    def failures(self, threshold: float = HEALTH_THRESHOLD) -> List[str]:
+        return [
+            name for name in self.checked
+            if SELECTORS[name].required and self.hit_rate(name) < threshold
+        ]
+
+    def print_table(self, threshold: float = HEALTH_THRESHOLD):
+        print(f"{'selector':<22} {'page':<11} {'hits':>11} {'rate':>7}  fallback")
+        for name, checked in sorted(self.checked.items(), key=lambda item: (SELECTORS[item[0]].page, item[0])):
+            selector = SELECTORS[name]
+            rate = self.hit_rate(name)
+            flag = "  FAIL" if selector.required and rate < threshold else ""
+            print(f"{name:<22} {selector.page:<11} {self.hits[name]:>5}/{checked:<5} "
+                  f"{rate:>7.1%}  {self.fallback_hits[name]}{flag}")
+
+
+def iter_corpus(cache_dir: Optional[str] = None, pages_dir: Optional[str] = None):
+    """Yield (page type, html) from the page cache and/or a directory of saved .html files"""
+    if cache_dir:
+        from page_cache import PageCache
+        cache = PageCache(cache_dir, replay=True)
+        for url in cache.urls("https://www.flashscore.com/"):
+            html = cache.get(url)
+            if html is not None:
+                yield page_type(url), html
+        cache.close()
+    if pages_dir:
+        for filename in sorted(os.listdir(pages_dir)):
+            if filename.endswith((".html", ".htm")):
+                with open(os.path.join(pages_dir, filename), "r", encoding="utf-8") as f:
+                    yield page_type(filename), f.read()
+
+
+def health_check(cache_dir: Optional[str] = None, pages_dir: Optional[str] = None,
+                 backend: Optional[str] = None) -> HealthReport:
+    from html_parser import PARSER_BACKEND, parse_html
+
+    report = HealthReport()
+    for page, html in iter_corpus(cache_dir, pages_dir):
+        report.check(parse_html(html, backend=backend or PARSER_BACKEND), page)
+    return report
+
+
+def main():
+    from html_parser import BACKENDS
+
+    parser = argparse.ArgumentParser(description="Run every registered selector against saved pages and report hit rates")
+    parser.add_argument("--cache-dir", type=str, help="Page cache written by fetch_match_details.py --cache-dir")
+    parser.add_argument("--pages", type=str, help="Directory of saved .html pages")
+    parser.add_argument("--threshold", type=float, default=HEALTH_THRESHOLD,
+                        help="Minimum hit rate for required selectors")
+    parser.add_argument("--parser", type=str, choices=BACKENDS,
+                        help="HTML parser backend; selectolax skips BeautifulSoup entirely")
+    args = parser.parse_args()
+
+    if not args.cache_dir and not args.pages:
+        parser.error("give --cache-dir and/or --pages")
+
+    report = health_check(args.cache_dir, args.pages, args.parser)
+    if not report.pages:
+        print("No pages found")
+        sys.exit(1)
+
+    print(f"Checked {report.pages} pages")
+    report.print_table(args.threshold)
+    failures = report.failures(args.threshold)
+    if failures:
+        print(f"\n{len(failures)} required selectors below {args.threshold:.0%}: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
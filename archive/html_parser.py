@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+import importlib.util
+import logging
+import re
+from typing import Dict, NamedTuple, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    # selectolax 1.0 removed the Modest backend; Lexbor is the one that stays
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+logger = logging.getLogger(__name__)
+
+
+def _available_builder() -> str:
+    """lxml when installed (several times faster), otherwise the stdlib html.parser"""
+    return "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
+# Constants
+TREE_BUILDER = _available_builder()
+BACKENDS = ("selectolax", "lxml", "html.parser")
+# BeautifulSoup by default: the match extractors use its API. selectolax hands back its own tree,
+# which flashscore_selectors.Selector can search through each selector's css
+PARSER_BACKEND = TREE_BUILDER
+
+
+class Strainer(NamedTuple):
+    """A subtree filter, as a CSS selector and a SoupStrainer for BeautifulSoup"""
+    css: str
+    soup_strainer: SoupStrainer
+
+
+# Only the subtrees get_match_info reads from the header
+HEADER_STRAINER = Strainer(
+    css=".tournamentHeader__country, .duelParticipant, .detailScore__wrapper, .detailScore__fullTime, "
+        ".detailScore__status, [class^='wclHeaderSection--summary'], [class^='wcl-infoLabelWrapper'], "
+        "[class^='wcl-infoValue'], .oddsRowContent",
+    soup_strainer=SoupStrainer(class_=re.compile(
+        '^(tournamentHeader__country|duelParticipant|detailScore__|wclHeaderSection--summary|'
+        'wcl-infoLabelWrapper|wcl-infoValue|oddsRowContent)'
+    ))
+)
+STATISTICS_STRAINER = Strainer(
+    css="[data-testid='wcl-statistics']",
+    soup_strainer=SoupStrainer(attrs={'data-testid': 'wcl-statistics'})
+)
+COMMENTARY_STRAINER = Strainer(
+    css="[data-testid='wcl-commentary']",
+    soup_strainer=SoupStrainer(attrs={'data-testid': 'wcl-commentary'})
+)
+
+
+def parse_html(html: str, strainer: Optional[Strainer] = None, backend: str = PARSER_BACKEND):
+    """
+    Parse a document with the given backend. BeautifulSoup backends build only the subtrees matched
+    by a strainer; selectolax builds the whole tree in C in one pass and returns it as is.
+    """
+    if backend == "selectolax":
+        if HTMLParser is None:
+            raise ImportError("selectolax is not installed")
+        return HTMLParser(html)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+    if strainer is None:
+        return BeautifulSoup(html, features=backend)
+    return BeautifulSoup(html, features=backend, parse_only=strainer.soup_strainer)
+
+
+class ParsedPage:
+    """One page_source snapshot, parsed at most once per strainer and shared by every extractor"""
+
+    def __init__(self, page_source: str, url: Optional[str] = None, backend: str = PARSER_BACKEND):
+        self.page_source = page_source
+        self.current_url = url
+        self.backend = backend
+        self._soup = None
+        self._partial: Dict[str, BeautifulSoup] = {}
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            self._soup = parse_html(self.page_source, backend=self.backend)
+        return self._soup
+
+    def partial(self, strainer: Strainer):
+        # A full parse already exists, so searching it is cheaper than parsing again.
+        # selectolax has no partial parse; its whole tree is built once and shared
+        if self._soup is not None or self.backend == "selectolax":
+            return self.soup
+        if strainer.css not in self._partial:
+            self._partial[strainer.css] = parse_html(self.page_source, strainer, self.backend)
+        return self._partial[strainer.css]
+
+
+def page_soup(page, strainer: Optional[Strainer] = None):
+    """Shared tree for a ParsedPage; a live driver's page_source is parsed on every call"""
+    if isinstance(page, ParsedPage):
+        return page.soup if strainer is None else page.partial(strainer)
+    return parse_html(page.page_source, strainer)
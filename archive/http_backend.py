@@ -0,0 +1,389 @@
+#!/usr/bin/env python
+
+import argparse
+import asyncio
+import datetime
+import logging
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import requests
+
+from change_detection import DIGEST_FILE, ChangeFilter, DigestIndex
+from output_writers import OUTPUT_FORMATS, open_writer
+from stat_labels import keyed_statistics
+from stat_values import typed_statistics
+from page_cache import CACHE_DIR, DEFAULT_KIND, CacheMiss, PageCache
+from rate_limit import RateLimiter, for_host, is_blocked, retry_after
+
+if TYPE_CHECKING:
+    from async_fetch import AsyncFetcher  # Imported where it is used, so FeedClient works without httpx
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    filename='http_backend.log'
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+FEED_URL = "https://local-global.flashscore.ninja/2/x/feed/"
+FEED_SIGN = "SW9D1eZo"  # x-fsign header the Flashscore frontend sends with every feed request
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/113.0.0.0 Safari/537.36",
+    "Accept": "*/*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Referer": "https://www.flashscore.com/",
+    "Origin": "https://www.flashscore.com",
+    "x-fsign": FEED_SIGN,
+}
+TIMEOUT = 15
+REQUESTS_PER_SECOND = 5.0
+OUTPUT_DIR = "processed"
+
+# Feed format: records split by "~", fields by "¬", key and value by "÷"
+RECORD_SEPARATOR = "~"
+FIELD_SEPARATOR = "¬"
+VALUE_SEPARATOR = "÷"
+
+# Feed names, relative to FEED_URL
+MATCHES_FEED = "f_1_{day}_3_en_1"          # football matches, day offset from today
+MATCH_FEED = "dc_1_{match_id}"             # one match's header, in the matches feed's field codes
+STATISTICS_FEED = "df_st_1_{match_id}"
+COMMENTARY_FEED = "df_lc_1_{match_id}"
+
+# Field codes in the matches feed
+TOURNAMENT_KEY = "ZA"
+MATCH_ID_KEY = "AA"
+START_TIME_KEY = "AD"
+STATUS_KEY = "AB"
+HOME_TEAM_KEY = "AE"
+AWAY_TEAM_KEY = "AF"
+HOME_SCORE_KEY = "AG"
+AWAY_SCORE_KEY = "AH"
+MATCH_STATUSES = {"1": "scheduled", "2": "live", "3": "finished"}  # Also the page cache kinds
+
+# Field codes in the statistics feed
+PERIOD_KEY = "SE"
+STAT_LABEL_KEY = "SG"
+STAT_HOME_KEY = "SH"
+STAT_AWAY_KEY = "SI"
+STATISTICS_PERIODS = {
+    "Match": "full_time",
+    "1st Half": "1st_half",
+    "2nd Half": "2nd_half",
+    "Extra Time": "extra_time",
+}
+
+# Field codes in the live commentary feed
+COMMENTARY_MINUTE_KEY = "MB"
+COMMENTARY_TEXT_KEY = "MD"
+
+
+def parse_feed(body: str) -> List[Dict[str, str]]:
+    """Split a raw feed body into a list of key/value records"""
+    records = []
+    for raw_record in body.split(RECORD_SEPARATOR):
+        record = {}
+        for field in raw_record.split(FIELD_SEPARATOR):
+            if VALUE_SEPARATOR not in field:
+                continue
+            key, value = field.split(VALUE_SEPARATOR, 1)
+            record[key] = value
+        if record:
+            records.append(record)
+    return records
+
+
+def parse_matches_feed(body: str) -> List[Dict[str, Any]]:
+    """Match records in the same shape as FlashscoreScraper.get_match_ids plus kick-off time"""
+    matches = []
+    tournament = None
+    for record in parse_feed(body):
+        if TOURNAMENT_KEY in record:
+            tournament = record[TOURNAMENT_KEY]
+        if MATCH_ID_KEY not in record:
+            continue
+
+        start_time = record.get(START_TIME_KEY)
+        matches.append({
+            "id": record[MATCH_ID_KEY],
+            "tournament": tournament,
+            "teams": {
+                "home": record.get(HOME_TEAM_KEY),
+                "away": record.get(AWAY_TEAM_KEY)
+            },
+            "score": {
+                "home": record.get(HOME_SCORE_KEY),
+                "away": record.get(AWAY_SCORE_KEY)
+            },
+            "status": MATCH_STATUSES.get(record.get(STATUS_KEY), record.get(STATUS_KEY)),
+            "local_datetime": datetime.datetime.fromtimestamp(int(start_time)).isoformat() if start_time else None
+        })
+    return matches
+
+
+def parse_match_feed(body: str) -> Dict[str, Any]:
+    """Tournament, kick-off, teams and score of one match, in the keys get_match_info uses"""
+    matches = parse_matches_feed(body)
+    if not matches:
+        return {}
+    match = matches[0]
+    score = {"match_status": match["status"]}
+    if match["score"]["home"] is not None and match["score"]["away"] is not None:
+        score["final_result"] = f"{match['score']['home']}-{match['score']['away']}"
+    return {
+        "tournament": match["tournament"],
+        "local_datetime": match["local_datetime"],
+        "home_team": match["teams"]["home"],
+        "away_team": match["teams"]["away"],
+        "score": score
+    }
+
+
+def parse_statistics_feed(body: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Statistics per period keyed by stat ID, each {label, home_value, away_value} plus typed values, like get_statistics"""
+    statistics = {}
+    period = None
+    for record in parse_feed(body):
+        if PERIOD_KEY in record:
+            period = STATISTICS_PERIODS.get(record[PERIOD_KEY], record[PERIOD_KEY].lower().replace(" ", "_"))
+            statistics.setdefault(period, [])
+        if STAT_LABEL_KEY in record and period is not None:
+            statistics[period].append({
+                "label": record[STAT_LABEL_KEY],
+                "home_value": record.get(STAT_HOME_KEY),
+                "away_value": record.get(STAT_AWAY_KEY)
+            })
+    return {period: typed_statistics(keyed_statistics(rows)) for period, rows in statistics.items()}
+
+
+def parse_commentary_feed(body: str) -> List[List[str]]:
+    """Commentary as [minute, comment] pairs, like get_commentary"""
+    comments = []
+    for record in parse_feed(body):
+        if COMMENTARY_TEXT_KEY not in record:
+            continue
+        minute = record.get(COMMENTARY_MINUTE_KEY, "0").replace("'", "") or "0"
+        comments.append([minute, record[COMMENTARY_TEXT_KEY]])
+    return comments
+
+
+def day_kind(day: int) -> str:
+    """Cache kind for a matches feed by day offset"""
+    if day < 0:
+        return "finished"
+    return "live" if day == 0 else "scheduled"
+
+
+def record_feed(record_dir: Optional[str], feed: str, body: str):
+    """Save a raw feed body so feed_replay_server.py can serve it later"""
+    if record_dir:
+        with open(os.path.join(record_dir, feed), "w", encoding="utf-8") as f:
+            f.write(body)
+
+
+class FeedClient:
+    """Fetches Flashscore data feeds over plain HTTP, no browser involved"""
+
+    def __init__(self, feed_url: str = FEED_URL, session: Optional[requests.Session] = None,
+                 record_dir: Optional[str] = None, cache: Optional[PageCache] = None,
+                 limiter: Optional[RateLimiter] = None):
+        self.feed_url = feed_url if feed_url.endswith("/") else feed_url + "/"
+        self.limiter = limiter
+        self.session = session or requests.Session()
+        self.session.headers.update(HEADERS)
+        self.record_dir = record_dir
+        self.cache = cache
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+
+    def fetch(self, feed: str, kind: str = DEFAULT_KIND) -> str:
+        """Return the raw body of one feed, from the cache while fresh, optionally recording it for offline replay"""
+        url = self.feed_url + feed
+        if self.cache is not None:
+            body = self.cache.get(url)
+            if body is not None:
+                return body
+            if self.cache.replay:
+                raise CacheMiss(url)
+
+        if self.limiter:
+            self.limiter.wait()
+        response = self.session.get(url, timeout=TIMEOUT)
+        if self.limiter and is_blocked(response.status_code):
+            self.limiter.backoff(retry_after(response.headers))
+        response.raise_for_status()
+        body = response.text
+        record_feed(self.record_dir, feed, body)
+        if self.cache is not None:
+            self.cache.put(url, body, kind)
+        return body
+
+    def get_matches(self, day: int = 0) -> List[Dict[str, Any]]:
+        return parse_matches_feed(self.fetch(MATCHES_FEED.format(day=day), day_kind(day)))
+
+    def get_match_info(self, match_id: str, kind: str = DEFAULT_KIND) -> Dict[str, Any]:
+        return parse_match_feed(self.fetch(MATCH_FEED.format(match_id=match_id), kind))
+
+    def get_statistics(self, match_id: str, kind: str = DEFAULT_KIND) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        return parse_statistics_feed(self.fetch(STATISTICS_FEED.format(match_id=match_id), kind))
+
+    def get_commentary(self, match_id: str, kind: str = DEFAULT_KIND) -> List[List[str]]:
+        return parse_commentary_feed(self.fetch(COMMENTARY_FEED.format(match_id=match_id), kind))
+
+    def get_match_details(self, match_id: str, kind: str = DEFAULT_KIND) -> Dict[str, Any]:
+        """Match info, statistics and commentary record in the daily output format"""
+        match_data = {"id": match_id}
+        try:
+            match_data = match_data | self.get_match_info(match_id, kind)
+        except (requests.RequestException, CacheMiss) as e:
+            logger.error(f"Error getting match info for {match_id}: {e}")
+        try:
+            match_data["statistics"] = self.get_statistics(match_id, kind)
+        except (requests.RequestException, CacheMiss) as e:
+            logger.error(f"Error getting statistics for {match_id}: {e}")
+        try:
+            match_data["commentary"] = self.get_commentary(match_id, kind)
+        except (requests.RequestException, CacheMiss) as e:
+            logger.warning(f"Commentary not available for {match_id}: {e}")
+        return match_data
+
+
+class AsyncFeedClient:
+    """Feed client on the asyncio engine, for backfills with hundreds of fetches in flight"""
+
+    def __init__(self, fetcher: "AsyncFetcher", feed_url: str = FEED_URL, record_dir: Optional[str] = None,
+                 cache: Optional[PageCache] = None):
+        self.fetcher = fetcher
+        self.feed_url = feed_url if feed_url.endswith("/") else feed_url + "/"
+        self.record_dir = record_dir
+        self.cache = cache
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+
+    async def fetch(self, feed: str, kind: str = DEFAULT_KIND) -> str:
+        url = self.feed_url + feed
+        if self.cache is not None:
+            body = self.cache.get(url)
+            if body is not None:
+                return body
+            if self.cache.replay:
+                raise CacheMiss(url)
+
+        body = await self.fetcher.fetch(url)
+        record_feed(self.record_dir, feed, body)
+        if self.cache is not None:
+            self.cache.put(url, body, kind)
+        return body
+
+    async def get_matches(self, days: List[int]) -> List[Dict[str, Any]]:
+        """Match rows for several day offsets at once"""
+        bodies = await asyncio.gather(*(self.fetch(MATCHES_FEED.format(day=day), day_kind(day)) for day in days))
+        return [match for body in bodies for match in parse_matches_feed(body)]
+
+    async def get_match_details(self, match_id: str, kind: str = DEFAULT_KIND) -> Dict[str, Any]:
+        """Match info, statistics and commentary fetched concurrently for one match"""
+        info, statistics, commentary = await asyncio.gather(
+            self.fetch(MATCH_FEED.format(match_id=match_id), kind),
+            self.fetch(STATISTICS_FEED.format(match_id=match_id), kind),
+            self.fetch(COMMENTARY_FEED.format(match_id=match_id), kind),
+            return_exceptions=True
+        )
+        match_data = {"id": match_id}
+        if isinstance(info, Exception):
+            logger.error(f"Error getting match info for {match_id}: {info}")
+        else:
+            match_data = match_data | parse_match_feed(info)
+        if isinstance(statistics, Exception):
+            logger.error(f"Error getting statistics for {match_id}: {statistics}")
+        else:
+            match_data["statistics"] = parse_statistics_feed(statistics)
+        if isinstance(commentary, Exception):
+            logger.warning(f"Commentary not available for {match_id}: {commentary}")
+        else:
+            match_data["commentary"] = parse_commentary_feed(commentary)
+        return match_data
+
+
+async def scrape_matches_async(match_ids: List[str], writer, feed_url: str = FEED_URL,
+                               concurrency: int = 16, http2: bool = False, record_dir: Optional[str] = None,
+                               cache: Optional[PageCache] = None, kinds: Optional[Dict[str, str]] = None,
+                               limiter: Optional[RateLimiter] = None):
+    """Fetch match details concurrently and stream them to the writer as they complete"""
+    from async_fetch import AsyncFetcher
+
+    kinds = kinds or {}
+    async with AsyncFetcher(HEADERS, http2=http2, per_host_limit=concurrency, limiter=limiter) as fetcher:
+        client = AsyncFeedClient(fetcher, feed_url, record_dir, cache)
+        for done in asyncio.as_completed([
+            client.get_match_details(match_id, kinds.get(match_id, DEFAULT_KIND)) for match_id in match_ids
+        ]):
+            writer.write(await done)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Flashscore match details from the data feeds, without a browser")
+    parser.add_argument("--day", type=int, default=-1, help="Day offset from today for the matches feed")
+    parser.add_argument("--input", type=str, help="File with one match ID per line instead of the matches feed")
+    parser.add_argument("--feed-url", type=str, default=FEED_URL, help="Feed base URL, e.g. a local replay server")
+    parser.add_argument("--record", type=str, help="Directory to save raw feed responses for replay")
+    parser.add_argument("--output-dir", type=str, default=OUTPUT_DIR, help="Directory for the daily output")
+    parser.add_argument("--format", type=str, default="json", choices=OUTPUT_FORMATS,
+                        help="Pretty JSON array, or append-only JSON Lines (optionally zstd-compressed)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Fetches in flight per host; above 1 uses the asyncio engine")
+    parser.add_argument("--http2", action="store_true", help="Use HTTP/2 in the asyncio engine")
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND,
+                        help="Feed requests per second, shared with other processes on this machine")
+    parser.add_argument("--cache-dir", type=str, help=f"Cache feed bodies here (replay default: {CACHE_DIR})")
+    parser.add_argument("--replay", action="store_true", help="Re-run the feed parsers from the cache only")
+    parser.add_argument("--changes-only", action="store_true",
+                        help="Write only matches that are new or differ from their last fetch")
+    parser.add_argument("--digests", type=str, default=DIGEST_FILE, help="Last-seen content hash index")
+    args = parser.parse_args()
+
+    cache = None
+    if args.replay:
+        cache = PageCache(args.cache_dir or CACHE_DIR, replay=True)
+    elif args.cache_dir:
+        cache = PageCache(args.cache_dir)
+    client = FeedClient(args.feed_url, record_dir=args.record, cache=cache, limiter=for_host(args.feed_url, args.rate))
+
+    try:
+        kinds = {}
+        if args.input:
+            with open(args.input, "r") as f:
+                match_ids = [line.strip() for line in f if line.strip()]
+        else:
+            matches = client.get_matches(args.day)
+            match_ids = [match["id"] for match in matches]
+            # Finished matches stay cached forever, live ones only for seconds
+            kinds = {match["id"]: match["status"] for match in matches if match["status"] in MATCH_STATUSES.values()}
+
+        date = datetime.date.today() + datetime.timedelta(days=args.day)
+        os.makedirs(args.output_dir, exist_ok=True)
+        writer = open_writer(os.path.join(args.output_dir, f"{date}"), args.format)
+        if args.changes_only:
+            writer = ChangeFilter(writer, DigestIndex(args.digests), "feed_details")
+        try:
+            if args.concurrency > 1:
+                asyncio.run(scrape_matches_async(
+                    match_ids, writer, args.feed_url, args.concurrency, args.http2, args.record, cache, kinds,
+                    client.limiter
+                ))
+            else:
+                for idx, match_id in enumerate(match_ids):
+                    logger.info(f"Processing match {match_id} ({idx + 1}/{len(match_ids)})")
+                    writer.write(client.get_match_details(match_id, kinds.get(match_id, DEFAULT_KIND)))
+        finally:
+            writer.close()
+            if cache is not None:
+                cache.log_summary()
+        logger.info(f"Saved {writer.count} matches to {writer.output_file}")
+    except Exception as e:
+        logger.error(f"Fatal error: {e}")
+
+
+if __name__ == "__main__":
+    main()
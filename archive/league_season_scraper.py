@@ -1,12 +1,9 @@
 #!/usr/bin/env python
 
 import logging
-import json
 import os
-import random
-import time
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterator, List, Optional
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
@@ -17,6 +14,13 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 
+from consent import BANNER_WAIT, accept_consent
+from driver_pool import DriverPool
+from output_writers import JsonlWriter
+from rate_limit import for_host
+from row_extractor import click_show_more, extract_match_rows, extract_new_rows, is_complete, row_statistics
+from waits import wait_for_count
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,12 +32,17 @@ logger = logging.getLogger(__name__)
 # Constants
 WAIT_TIME = 20
 RETRY_ATTEMPTS = 3
-DELAY_BETWEEN_REQUESTS = (1, 3)  # Random delay range in seconds
+REQUESTS_PER_SECOND = 0.5  # Pacing for page loads and "show more" clicks
 
 class LeagueSeasonScraper:
-    def __init__(self):
-        self.driver = None
-        self.setup_driver()
+    def __init__(self, driver=None, limiter=None):
+        # A driver handed in from a DriverPool is owned by the pool and not quit here
+        self.owns_driver = driver is None
+        self.driver = driver
+        # One token bucket per host, shared with every other scraper process on the machine
+        self.limiter = limiter or for_host("https://www.flashscore.com", REQUESTS_PER_SECOND)
+        if self.owns_driver:
+            self.setup_driver()
 
     def setup_driver(self):
         """Initialize Chrome WebDriver with optimal settings"""
@@ -60,14 +69,8 @@ class LeagueSeasonScraper:
 
     def handle_consent(self):
         """Handle GDPR consent popup if present"""
-        try:
-            consent_button = WebDriverWait(self.driver, 5).until(
-                EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-            )
-            consent_button.click()
-            time.sleep(1)
-        except:
-            pass
+        # Pooled drivers were primed; a driver of our own may still get the banner after load
+        accept_consent(self.driver, banner_wait=BANNER_WAIT if self.owns_driver else 0)
 
     def wait_for_element(self, by: By, value: str, timeout: int = WAIT_TIME):
         """Wait for an element to be present"""
@@ -78,124 +81,133 @@ class LeagueSeasonScraper:
         except TimeoutException:
             return None
 
-    def get_season_matches(self, league_url: str) -> List[Dict[str, Any]]:
+    def get_season_matches(self, league_url: str, page: str = "results") -> List[Dict[str, Any]]:
         """Get all matches for a season from the results page"""
-        matches = []
-        url = f"{league_url}/results/"
+        return list(self.iter_season_matches(league_url, page))
+
+    def iter_season_matches(self, league_url: str, page: str = "results", incremental: bool = True,
+                            prune: bool = False, strict: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a season's matches while "Show more matches" expands the results page.
+        incremental: read only the rows each click appends (tracked by match ID) instead of the whole
+        expanded DOM at the end; prune: hide rows once read so the page stays light;
+        strict: raise instead of stopping early, so a season that was not fully expanded is never taken as complete
+        """
+        url = f"{league_url}/{page}/"
+        seen = set()
+        clicks = 0
         
         try:
             logger.info(f"Fetching season matches from: {url}")
+            self.limiter.wait()
             self.driver.get(url)
             self.handle_consent()
             
             # Wait for the results container to load
             results_container = self.wait_for_element(By.CLASS_NAME, "sportName")
             if not results_container:
+                if strict:
+                    raise TimeoutException(f"Results container not found on {url}")
                 logger.error("Results container not found")
-                return matches
+                return
 
-            # Keep clicking "Show more matches" until all matches are loaded
             while True:
-                try:
-                    more_button = self.wait_for_element(By.CLASS_NAME, "event__more", timeout=5)
-                    if not more_button or not more_button.is_displayed():
+                if incremental:
+                    rows = self.new_rows(seen, prune)
+                    # A click that appended nothing new means the season is fully loaded
+                    if clicks and not rows:
                         break
-                    self.driver.execute_script("arguments[0].click();", more_button)
-                    time.sleep(random.uniform(*DELAY_BETWEEN_REQUESTS))
-                except:
+                    for row in rows:
+                        match_data = self.match_data(row, league_url)
+                        if match_data:
+                            yield match_data
+
+                row_count = self.driver.execute_script(
+                    "return document.querySelectorAll('.event__match').length"
+                )
+                self.limiter.wait()
+                if not click_show_more(self.driver):
+                    break
+                clicks += 1
+                # Continue as soon as the next batch of rows is appended
+                if not wait_for_count(self.driver, ".event__match", row_count + 1):
+                    if strict:
+                        raise TimeoutException(f"No rows appended after click {clicks} on {url}")
                     break
 
-            # Get all match rows
-            match_rows = self.driver.find_elements(By.CLASS_NAME, "event__match")
-            
-            for match in match_rows:
-                try:
-                    match_data = {
-                        "date": match.find_element(By.CLASS_NAME, "event__time").text,
-                        "home_team": match.find_element(By.CLASS_NAME, "event__participant--home").text,
-                        "away_team": match.find_element(By.CLASS_NAME, "event__participant--away").text,
-                        "score": {
-                            "home": match.find_element(By.CLASS_NAME, "event__score--home").text,
-                            "away": match.find_element(By.CLASS_NAME, "event__score--away").text
-                        },
-                        "league": league_url.split("/")[-1]
-                    }
-                    
-                    # Get match statistics if available
-                    stats = self.get_match_statistics(match)
-                    if stats:
-                        match_data.update(stats)
-                    
-                    matches.append(match_data)
-                    logger.info(f"Processed: {match_data['home_team']} vs {match_data['away_team']}")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing match: {e}")
-                    continue
-                
-            return matches
+            # wait_for_count returns on the first row of a batch, so read the rest of the last batch now.
+            # Without incremental, this is where every row is read, in a single round trip
+            rows = self.new_rows(seen, prune) if incremental else extract_match_rows(self.driver)
+            for row in rows:
+                match_data = self.match_data(row, league_url)
+                if match_data:
+                    yield match_data
+            logger.info(f"Expanded {url} {clicks} times")
             
         except Exception as e:
+            if strict:
+                raise
             logger.error(f"Error scraping league {league_url}: {e}")
-            return matches
 
-    def get_match_statistics(self, match_element) -> Dict[str, Any]:
-        """Extract available statistics from a match element"""
-        stats = {}
-        
+    def new_rows(self, seen: set, prune: bool) -> List[Dict[str, Any]]:
+        """Rows appended since the last read; rows without an ID are never taken for duplicates"""
+        rows = []
+        for row in extract_new_rows(self.driver, prune):
+            if row.get("id") is not None:
+                if row["id"] in seen:
+                    continue
+                seen.add(row["id"])
+            rows.append(row)
+        return rows
+
+    def match_data(self, match: Dict[str, Any], league_url: str) -> Optional[Dict[str, Any]]:
+        """Build a match record from an extracted row, or None if the row is not a finished result"""
         try:
-            # Get possession stats if available
-            possession_elements = match_element.find_elements(By.CLASS_NAME, "event__possession")
-            if possession_elements:
-                stats["possession"] = {
-                    "home": possession_elements[0].text if len(possession_elements) > 0 else None,
-                    "away": possession_elements[1].text if len(possession_elements) > 1 else None
-                }
+            if not is_complete(match):
+                return None
+            match_data = {
+                "id": match["id"].split("_")[-1] if match.get("id") else None,
+                "date": match["date"],
+                "home_team": match["home_team"],
+                "away_team": match["away_team"],
+                "score": {
+                    "home": match["home_score"],
+                    "away": match["away_score"]
+                },
+                "league": league_url.split("/")[-1]
+            }
             
-            # Get cards
-            home_cards = len(match_element.find_elements(By.CSS_SELECTOR, ".event__card.event__card--home"))
-            away_cards = len(match_element.find_elements(By.CSS_SELECTOR, ".event__card.event__card--away"))
-            if home_cards or away_cards:
-                stats["cards"] = {"home": home_cards, "away": away_cards}
+            # Add match statistics if available
+            match_data.update(row_statistics(match))
             
-            # Get corners
-            home_corners = len(match_element.find_elements(By.CSS_SELECTOR, ".event__corner.event__corner--home"))
-            away_corners = len(match_element.find_elements(By.CSS_SELECTOR, ".event__corner.event__corner--away"))
-            if home_corners or away_corners:
-                stats["corners"] = {"home": home_corners, "away": away_corners}
-                
-        except Exception as e:
-            logger.warning(f"Could not get match statistics: {e}")
+            logger.info(f"Processed: {match_data['home_team']} vs {match_data['away_team']}")
+            return match_data
             
-        return stats
+        except Exception as e:
+            logger.error(f"Error processing match: {e}")
+            return None
 
-    def save_season_data(self, matches: List[Dict[str, Any]], league_name: str):
-        """Save the season data to JSON file"""
-        if not matches:
-            logger.warning("No matches to save")
-            return
-            
+    def season_output_file(self, league_name: str) -> str:
         output_dir = os.path.join("data", "seasons", league_name)
         os.makedirs(output_dir, exist_ok=True)
-        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = os.path.join(output_dir, f"season_2024_2025_{timestamp}.json")
-        
-        try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(matches, f, indent=2, ensure_ascii=False)
-            logger.info(f"Saved {len(matches)} matches to {output_file}")
-        except Exception as e:
-            logger.error(f"Error saving data: {e}")
+        return os.path.join(output_dir, f"season_2024_2025_{timestamp}.jsonl")
 
     def scrape_league(self, league_url: str):
-        """Main method to scrape a league's season data"""
+        """Main method to scrape a league's season data, writing matches as the page expands"""
         try:
-            matches = self.get_season_matches(league_url)
             league_name = league_url.split("/")[-1]
-            self.save_season_data(matches, league_name)
+            output_file = self.season_output_file(league_name)
+            with JsonlWriter(output_file) as writer:
+                for match in self.iter_season_matches(league_url):
+                    writer.write(match)
+            if writer.count:
+                logger.info(f"Saved {writer.count} matches to {output_file}")
+            else:
+                logger.warning("No matches to save")
+                os.remove(output_file)
         finally:
-            if self.driver:
+            if self.driver and self.owns_driver:
                 self.driver.quit()
 
 def main():
@@ -210,14 +222,14 @@ def main():
         # "https://www.flashscore.com/football/portugal/liga-portugal",
     ]
     
-    for league_url in leagues:
-        try:
-            scraper = LeagueSeasonScraper()
-            scraper.scrape_league(league_url)
-            # Add delay between leagues
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logger.error(f"Error processing league {league_url}: {e}")
+    with DriverPool(size=1) as pool:
+        for league_url in leagues:
+            try:
+                with pool.driver() as driver:
+                    scraper = LeagueSeasonScraper(driver)
+                    scraper.scrape_league(league_url)
+            except Exception as e:
+                logger.error(f"Error processing league {league_url}: {e}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+
+import argparse
+import datetime
+import heapq
+import logging
+import os
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from change_detection import DIGEST_FILE, ChangeFilter, DigestIndex
+from http_backend import FEED_URL, MATCH_STATUSES, FeedClient
+from output_writers import OUTPUT_FORMATS, open_writer
+from rate_limit import RateLimiter, for_host
+
+logger = logging.getLogger(__name__)
+
+# Constants
+BUDGET = 5.0            # Requests per second across list and detail polls, however many matches are on
+REQUESTS_PER_POLL = 3   # A detail poll fetches the match, statistics and commentary feeds
+LIST_INTERVAL = 60      # The day's match list refreshes every state at once
+OUTPUT_DIR = os.path.join("data", "live")
+DURATION = 3600
+
+# Tier -> (refresh interval in seconds, priority). Lower priorities are served first when over budget.
+CLOSING = "closing"         # 80th minute onwards and stoppage time
+LIVE = "live"
+FINISHED = "finished"       # Polled once more to finalize, then dropped
+KICKOFF_SOON = "kickoff_soon"
+HALF_TIME = "half_time"
+SCHEDULED = "scheduled"
+TIERS = {
+    CLOSING: (10, 0),
+    LIVE: (30, 1),
+    FINISHED: (0, 2),
+    KICKOFF_SOON: (60, 3),
+    HALF_TIME: (120, 3),
+    SCHEDULED: (900, 4),
+}
+CLOSING_MINUTE = 80
+KICKOFF_SOON_MINUTES = 15
+HALF_TIME_BREAK = 15        # Minutes, used to estimate the clock when the source only has a kick-off time
+
+
+class MatchState(NamedTuple):
+    status: str                                 # scheduled, live, half_time or finished
+    minute: Optional[int] = None
+    kickoff: Optional[datetime.datetime] = None
+
+
+def estimate_state(status: str, kickoff: Optional[datetime.datetime],
+                   now: Optional[datetime.datetime] = None) -> MatchState:
+    """Fill in half-time and the minute from the kick-off time for feeds that only say live"""
+    if status != "live" or kickoff is None:
+        return MatchState(status, None, kickoff)
+    elapsed = int(((now or datetime.datetime.now()) - kickoff).total_seconds() // 60)
+    if 45 < elapsed <= 45 + HALF_TIME_BREAK:
+        return MatchState("half_time", None, kickoff)
+    minute = elapsed if elapsed <= 45 else elapsed - HALF_TIME_BREAK
+    return MatchState(status, max(minute, 0), kickoff)
+
+
+def tier(state: MatchState, now: Optional[datetime.datetime] = None) -> str:
+    """Polling tier for a match state"""
+    if state.status == "finished":
+        return FINISHED
+    if state.status == "half_time":
+        return HALF_TIME
+    if state.status == "live":
+        return CLOSING if state.minute is not None and state.minute >= CLOSING_MINUTE else LIVE
+    if state.kickoff is not None:
+        until = (state.kickoff - (now or datetime.datetime.now())).total_seconds() / 60
+        if until <= KICKOFF_SOON_MINUTES:
+            return KICKOFF_SOON
+    return SCHEDULED
+
+
+class LiveScheduler:
+    """
+    Priority scheduler giving each match a refresh interval from its state, under one request budget.
+    The budget is the limiter's rate; the limiter must be the FeedClient's, which is what holds requests to it.
+    """
+
+    def __init__(self, limiter: RateLimiter, clock=time.monotonic):
+        self.limiter = limiter
+        self.budget = limiter.base_rate
+        self.clock = clock
+        self.states: Dict[str, MatchState] = {}
+        self.tiers: Dict[str, str] = {}
+        self.finalized = set()
+        self._version: Dict[str, int] = {}
+        self._waiting: List[Tuple[float, int, str]] = []       # (due, version, match_id)
+        self._ready: List[Tuple[int, float, int, str]] = []    # (priority, due, version, match_id)
+
+    def _schedule(self, match_id: str, due: float):
+        version = self._version.get(match_id, 0) + 1
+        self._version[match_id] = version
+        heapq.heappush(self._waiting, (due, version, match_id))
+
+    def update(self, match_id: str, state: MatchState):
+        """Record a match's latest state; a new match or a change of tier is polled right away"""
+        if match_id in self.finalized:
+            return
+        self.states[match_id] = state
+        new_tier = tier(state)
+        if self.tiers.get(match_id) != new_tier:
+            self.tiers[match_id] = new_tier
+            self._schedule(match_id, self.clock())
+
+    def done(self, match_id: str):
+        """Schedule the next poll after one finished; finished matches are dropped after this final one"""
+        match_tier = self.tiers.get(match_id)
+        if match_tier is None:
+            return
+        if match_tier == FINISHED:
+            self.finalized.add(match_id)
+            self._version[match_id] = self._version.get(match_id, 0) + 1  # Invalidates queued entries
+            del self.states[match_id], self.tiers[match_id]
+            return
+        self._schedule(match_id, self.clock() + TIERS[match_tier][0])
+
+    def next(self, timeout: float) -> Optional[str]:
+        """The most urgent due match, or None if nothing is due within timeout"""
+        deadline = self.clock() + timeout
+        while True:
+            now = self.clock()
+            while self._waiting and self._waiting[0][0] <= now:
+                due, version, match_id = heapq.heappop(self._waiting)
+                if self._version.get(match_id) == version:
+                    heapq.heappush(self._ready, (TIERS[self.tiers[match_id]][1], due, version, match_id))
+            while self._ready:
+                _, _, version, match_id = heapq.heappop(self._ready)
+                if self._version.get(match_id) == version:
+                    return match_id
+            if now >= deadline:
+                return None
+            next_due = self._waiting[0][0] if self._waiting else deadline
+            time.sleep(max(0.0, min(next_due, deadline) - now))
+
+    def demand(self) -> float:
+        """Requests per second the current states would need to be polled on time"""
+        return sum(REQUESTS_PER_POLL / TIERS[t][0] for t in self.tiers.values() if TIERS[t][0])
+
+    def log_load(self):
+        counts = {}
+        for match_tier in self.tiers.values():
+            counts[match_tier] = counts.get(match_tier, 0) + 1
+        demand = self.demand()
+        message = (f"Tracking {len(self.tiers)} matches {counts}, demand {demand:.2f} of {self.budget:.2f} req/s"
+                   f" (now {self.limiter.rate:.2f})")
+        if demand > self.budget:
+            # Over budget the most urgent tiers still run on time; the others fall behind
+            logger.warning(message + f", {len(self._ready)} polls waiting")
+        else:
+            logger.info(message)
+
+
+def poll_live(client: FeedClient, scheduler: LiveScheduler, writer, duration: float = DURATION,
+              list_interval: float = LIST_INTERVAL):
+    """Refresh today's match list now and then and poll each match's details on its own schedule"""
+    end_time = time.monotonic() + duration
+    next_list = 0.0
+    polls = 0
+    while time.monotonic() < end_time:
+        if time.monotonic() >= next_list:
+            for match in client.get_matches(0):
+                kickoff = datetime.datetime.fromisoformat(match["local_datetime"]) if match["local_datetime"] else None
+                scheduler.update(match["id"], estimate_state(match["status"], kickoff))
+            scheduler.log_load()
+            next_list = time.monotonic() + list_interval
+
+        match_id = scheduler.next(timeout=max(0.0, min(next_list, end_time) - time.monotonic()))
+        if match_id is None:
+            continue
+        state = scheduler.states[match_id]
+        # Cache kinds follow the feed statuses; half-time is still live
+        kind = state.status if state.status in MATCH_STATUSES.values() else "live"
+        try:
+            record = client.get_match_details(match_id, kind)
+            record.update(status=state.status, minute=state.minute,
+                          polled_at=datetime.datetime.now(datetime.timezone.utc).isoformat())
+            writer.write(record)
+            polls += 1
+        except Exception as e:
+            logger.error(f"Poll failed for {match_id}: {e}")
+        scheduler.done(match_id)
+    logger.info(f"Live polling finished after {polls} detail polls")
+
+
+def main():
+    # force: http_backend already pointed logging at its own file when it was imported
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', force=True)
+    parser = argparse.ArgumentParser(description="Poll live matches at intervals set by each match's state")
+    parser.add_argument("--duration", type=float, default=DURATION, help="Seconds to run")
+    parser.add_argument("--budget", type=float, default=BUDGET, help="Requests per second across all polls")
+    parser.add_argument("--feed-url", type=str, default=FEED_URL, help="Feed base URL, e.g. a local replay server")
+    parser.add_argument("--output-dir", type=str, default=OUTPUT_DIR)
+    parser.add_argument("--format", type=str, default="jsonl", choices=OUTPUT_FORMATS)
+    parser.add_argument("--digests", type=str, default=DIGEST_FILE,
+                        help="Last-seen record index; unchanged polls are skipped and changes written as deltas")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    writer = open_writer(os.path.join(args.output_dir, f"polls_{datetime.date.today()}"), args.format)
+    writer = ChangeFilter(writer, DigestIndex(args.digests), "feed_polls", deltas=True)
+    try:
+        limiter = for_host(args.feed_url, args.budget)
+        poll_live(FeedClient(args.feed_url, limiter=limiter), LiveScheduler(limiter), writer, args.duration)
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
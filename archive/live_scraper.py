@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+
+import argparse
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+import flashscore_selectors as sel
+from change_detection import DIGEST_FILE, ChangeFilter, DigestIndex
+from consent import accept_consent
+from driver_pool import DriverPool
+from fetch_match_details import REQUESTS_PER_SECOND, scrape_match
+from output_writers import JsonlWriter
+from rate_limit import RateLimiter, for_host
+from waits import wait_for_selector
+
+logger = logging.getLogger(__name__)
+
+# Constants
+LIVE_URL = "https://www.flashscore.com/football/"
+OUTPUT_DIR = os.path.join("data", "live")
+DURATION = 3600
+DRAIN_TIMEOUT = 1.0     # Longest a drain call blocks in the page waiting for the next change
+RELOAD_SECONDS = 1800   # Reopen the page now and then so a stalled push connection cannot go unnoticed
+DETAIL_FIELDS = ("home_score", "away_score", "status")  # Changes worth a detail scrape; minute ticks are not
+
+# Installs a MutationObserver that diffs only the .event__match rows touched by a mutation and queues
+# {id, t, fields} deltas in the page. The first scan queues every row so the caller starts from a full state.
+OBSERVER_JS = """
+    if (window.__liveDeltas) {
+        return false;
+    }
+    window.__liveDeltas = [];
+    var state = {};
+    function text(row, selector) {
+        var el = row.querySelector(selector);
+        return el ? el.innerText.trim() : null;
+    }
+    function read(row) {
+        // The stage block holds the running minute ("67'") or a status such as "Half Time" or "Finished"
+        var stage = text(row, '.event__stage--block');
+        var minute = stage && /^\\d/.test(stage) ? stage : null;
+        return {
+            home_team: text(row, '.event__participant--home'),
+            away_team: text(row, '.event__participant--away'),
+            home_score: text(row, '.event__score--home'),
+            away_score: text(row, '.event__score--away'),
+            minute: minute,
+            status: minute ? 'Live' : stage,
+            live: row.classList.contains('event__match--live')
+        };
+    }
+    function diff(row) {
+        if (!row.id) {
+            return;
+        }
+        var now = read(row), before = state[row.id] || {}, fields = {}, changed = false;
+        for (var key in now) {
+            if (now[key] !== before[key]) {
+                fields[key] = now[key];
+                changed = true;
+            }
+        }
+        if (changed) {
+            state[row.id] = now;
+            window.__liveDeltas.push({id: row.id, t: Date.now(), fields: fields});
+        }
+    }
+    document.querySelectorAll('.event__match').forEach(diff);
+
+    var dirty = new Set();
+    var scheduled = false;
+    function flush() {
+        scheduled = false;
+        dirty.forEach(function(row) {
+            if (row.isConnected) {
+                diff(row);
+            }
+        });
+        dirty.clear();
+    }
+    new MutationObserver(function(mutations) {
+        mutations.forEach(function(m) {
+            var node = m.target.nodeType === 1 ? m.target : m.target.parentElement;
+            var row = node && node.closest('.event__match');
+            if (row) {
+                dirty.add(row);
+            }
+            m.addedNodes.forEach(function(added) {
+                if (added.nodeType !== 1) {
+                    return;
+                }
+                if (added.matches('.event__match')) {
+                    dirty.add(added);
+                }
+                added.querySelectorAll('.event__match').forEach(function(r) { dirty.add(r); });
+            });
+        });
+        // One diff per touched row per batch, however many text nodes changed in it
+        if (!scheduled) {
+            scheduled = true;
+            setTimeout(flush, 0);
+        }
+    }).observe(document.body, {
+        childList: true, subtree: true, characterData: true, attributes: true, attributeFilter: ['class']
+    });
+    return true;
+"""
+
+# Hands back queued deltas as soon as there are any, or an empty list after timeoutMs; null if the
+# observer is gone because the page was replaced
+DRAIN_JS = """
+    var timeoutMs = arguments[0];
+    var done = arguments[arguments.length - 1];
+    if (!window.__liveDeltas) {
+        done(null);
+        return;
+    }
+    var started = Date.now();
+    (function poll() {
+        if (window.__liveDeltas.length || Date.now() - started >= timeoutMs) {
+            done(window.__liveDeltas.splice(0));
+        } else {
+            setTimeout(poll, 50);
+        }
+    })();
+"""
+
+
+class LiveFeed:
+    """One open scores page streaming per-row field changes from an in-page MutationObserver"""
+
+    def __init__(self, driver, url: str = LIVE_URL, limiter: Optional[RateLimiter] = None):
+        self.driver = driver
+        self.url = url
+        self.limiter = limiter
+        self.opened_at = 0.0
+        self.state: Dict[str, Dict[str, Any]] = {}
+
+    def open(self):
+        """Load the page and start observing it"""
+        if self.limiter:
+            self.limiter.wait()
+        self.driver.get(self.url)
+        accept_consent(self.driver)
+        wait_for_selector(self.driver, sel.MATCH_ROW.css)
+        self.driver.set_script_timeout(DRAIN_TIMEOUT + 10)
+        self.driver.execute_script(OBSERVER_JS)
+        self.opened_at = time.monotonic()
+        logger.info(f"Observing {self.url}")
+
+    def deltas(self, timeout: float = DRAIN_TIMEOUT) -> List[Dict[str, Any]]:
+        """Field changes since the last call; page reloads and repeated snapshots are diffed away here"""
+        raw = self.driver.execute_async_script(DRAIN_JS, int(timeout * 1000))
+        if raw is None:
+            logger.warning("Observer lost (page replaced), reinstalling")
+            self.open()
+            return []
+
+        deltas = []
+        for item in raw:
+            match_id = item["id"].split("_")[-1]
+            known = self.state.setdefault(match_id, {})
+            fields = {key: value for key, value in item["fields"].items() if known.get(key) != value}
+            if not fields:
+                continue
+            deltas.append({
+                "id": match_id,
+                "timestamp": datetime.fromtimestamp(item["t"] / 1000, timezone.utc).isoformat(),
+                "new": not known,
+                "fields": fields,
+            })
+            known.update(fields)
+        return deltas
+
+
+def detail_worker(pool: DriverPool, pending: "queue.Queue[Optional[str]]", queued: set, writer: ChangeFilter,
+                  limiter: RateLimiter):
+    """Scrape details for matches whose score or status changed, one at a time"""
+    while True:
+        match_id = pending.get()
+        if match_id is None:
+            return
+        # Changes arriving from here on need a fresh scrape
+        queued.discard(match_id)
+        try:
+            with pool.driver() as driver:
+                details = scrape_match(driver, match_id, limiter)
+            details["scraped_at"] = datetime.now(timezone.utc).isoformat()
+            writer.write(details)
+        except Exception as e:
+            logger.error(f"Detail scrape failed for {match_id}: {e}")
+
+
+def run_live(duration: float = DURATION, url: str = LIVE_URL, output_dir: str = OUTPUT_DIR, details: bool = True,
+             digests: str = DIGEST_FILE):
+    """Stream live row changes to JSONL and scrape details only for matches whose state changed, as deltas"""
+    os.makedirs(output_dir, exist_ok=True)
+    day = datetime.now().strftime("%Y%m%d")
+    limiter = for_host(url, REQUESTS_PER_SECOND)
+    pending: "queue.Queue[Optional[str]]" = queue.Queue()
+    queued = set()  # Match IDs waiting in pending, so a burst of changes costs one scrape
+    changes = 0
+    scheduled = 0
+
+    # One driver stays on the live page; the other serves detail scrapes
+    with DriverPool(size=2 if details else 1) as pool, \
+            JsonlWriter(os.path.join(output_dir, f"deltas_{day}.jsonl"), batch_size=1) as delta_writer, \
+            ChangeFilter(JsonlWriter(os.path.join(output_dir, f"details_{day}.jsonl"), batch_size=1),
+                         DigestIndex(digests), "live_details", deltas=True) as detail_writer:
+        live_driver = pool.acquire()
+        thread = None
+        if details:
+            thread = threading.Thread(target=detail_worker, args=(pool, pending, queued, detail_writer, limiter), daemon=True)
+            thread.start()
+
+        broken = False
+        try:
+            feed = LiveFeed(live_driver, url, limiter)
+            feed.open()
+            end_time = time.monotonic() + duration
+            while time.monotonic() < end_time:
+                if time.monotonic() - feed.opened_at > RELOAD_SECONDS:
+                    feed.open()
+                for delta in feed.deltas():
+                    delta_writer.write(delta)
+                    changes += 1
+                    if not details or delta["new"] or delta["id"] in queued:
+                        continue
+                    if any(field in delta["fields"] for field in DETAIL_FIELDS):
+                        logger.info(f"{delta['id']} changed {delta['fields']}, queueing detail scrape")
+                        queued.add(delta["id"])
+                        pending.put(delta["id"])
+                        scheduled += 1
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            pool.release(live_driver, broken=broken)
+            if thread:
+                pending.put(None)
+                thread.join()
+
+    logger.info(f"Live run finished: {changes} field changes, {scheduled} detail scrapes")
+
+
+def main():
+    # force: fetch_match_details already pointed logging at its own file when it was imported
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', force=True)
+    parser = argparse.ArgumentParser(description="Stream live score changes from one open Flashscore page")
+    parser.add_argument("--duration", type=float, default=DURATION, help="Seconds to run")
+    parser.add_argument("--url", type=str, default=LIVE_URL, help="Scores page to observe")
+    parser.add_argument("--output-dir", type=str, default=OUTPUT_DIR)
+    parser.add_argument("--no-details", action="store_true", help="Only record row changes")
+    parser.add_argument("--digests", type=str, default=DIGEST_FILE, help="Last-seen detail record index")
+    args = parser.parse_args()
+
+    run_live(args.duration, args.url, args.output_dir, details=not args.no_details, digests=args.digests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+
+import io
+import json
+import logging
+import os
+import re
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Constants
+BATCH_SIZE = 50
+ZSTD_SUFFIX = ".zst"
+OUTPUT_FORMATS = ("json", "jsonl", "jsonl.zst")
+ARRAY_SEPARATOR_RE = re.compile(r'[\s,]*')
+
+
+class DailyJsonWriter:
+    """Streams finished records into the daily JSON array as they arrive"""
+
+    def __init__(self, output_file, append=False):
+        self.output_file = output_file
+        self.count = 0
+        self._lock = threading.Lock()
+        self._has_records = False
+        self._existing_ids = set()  # Records a resumed run already wrote, e.g. before a crash left them unacknowledged
+        if append and os.path.exists(output_file) and os.path.getsize(output_file):
+            self._reopen_array()
+        else:
+            self._file = open(output_file, 'w', encoding='utf-8')
+            self._file.write('[')
+
+    def _reopen_array(self):
+        """Continue an existing array (e.g. a resumed run) after its last complete record"""
+        with open(self.output_file, 'rb') as f:
+            text = f.read().decode('utf-8', errors='replace')
+        start = text.find('[')
+        if start == -1:
+            raise ValueError(f"{self.output_file} is not a JSON array")
+
+        # Parse record by record: a crash can leave a torn record or no closing bracket behind
+        decoder = json.JSONDecoder()
+        end = pos = start + 1
+        while True:
+            pos = ARRAY_SEPARATOR_RE.match(text, pos).end()
+            try:
+                record, pos = decoder.raw_decode(text, pos)
+            except ValueError:
+                break
+            end = pos
+            self._has_records = True
+            if isinstance(record, dict) and record.get('id') is not None:
+                self._existing_ids.add(record['id'])
+        if text[end:].strip() not in ('', ']'):
+            logger.warning(f"Dropping a torn record at the end of {self.output_file}")
+
+        with open(self.output_file, 'r+b') as f:
+            f.truncate(len(text[:end].encode('utf-8')))
+        self._file = open(self.output_file, 'a', encoding='utf-8')
+        logger.info(f"Resuming {self.output_file} after {len(self._existing_ids)} records")
+
+    def write(self, record):
+        if record.get('id') in self._existing_ids:
+            logger.info(f"Skipping {record['id']}, already in {self.output_file}")
+            return
+        body = json.dumps(record, ensure_ascii=False, indent=2)
+        with self._lock:
+            self._file.write(',\n  ' if self._has_records else '\n  ')
+            self._file.write(body.replace('\n', '\n  '))
+            self._file.flush()
+            self._has_records = True
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            self._file.write('\n]' if self._has_records else ']')
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JsonlWriter:
+    """Append-only JSON Lines sink; a crash loses at most the batch not yet flushed"""
+
+    def __init__(self, output_file, batch_size=BATCH_SIZE, fsync=False, compress=None, skip_existing=False):
+        self.output_file = output_file
+        self.batch_size = max(1, batch_size)
+        self.fsync = fsync
+        # zstd output is a chain of independent frames, one per batch, so appends and partial files stay readable
+        self.compress = output_file.endswith(ZSTD_SUFFIX) if compress is None else compress
+        if self.compress and zstandard is None:
+            raise ImportError("zstd output needs the zstandard package (pip install zstandard)")
+        self.count = 0
+        self._batch = []
+        self._lock = threading.Lock()
+        # A resumed run may get records again that a crashed run wrote but never marked done
+        self._existing_ids = set()
+        if skip_existing and os.path.exists(output_file):
+            self._existing_ids = {record.get('id') for record in read_jsonl(output_file)} - {None}
+        self._file = open(output_file, 'ab')
+
+    def write(self, record):
+        if record.get('id') in self._existing_ids:
+            logger.info(f"Skipping {record['id']}, already in {self.output_file}")
+            return
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._batch.append(line)
+            self.count += 1
+            if len(self._batch) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+        if not self._batch:
+            return
+        data = ('\n'.join(self._batch) + '\n').encode('utf-8')
+        if self.compress:
+            data = zstandard.ZstdCompressor().compress(data)
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._batch = []
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_jsonl(path):
+    """Yield records from a .jsonl or .jsonl.zst file, skipping a torn last line"""
+    with open(path, 'rb') as raw:
+        if path.endswith(ZSTD_SUFFIX):
+            if zstandard is None:
+                raise ImportError("reading zstd output needs the zstandard package (pip install zstandard)")
+            raw = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        for line in io.TextIOWrapper(raw, encoding='utf-8'):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping unreadable line in {path}")
+
+
+def read_latest(path):
+    """
+    Records from a JSONL file with only the last copy of each id, in the order the ids first
+    appeared; re-scraped matches are appended rather than rewritten. Records without an id are all kept.
+    """
+    latest = {}
+    for index, record in enumerate(read_jsonl(path)):
+        key = record.get('id')
+        latest[index if key is None else ('id', key)] = record
+    return list(latest.values())
+
+
+def open_writer(output_base, output_format="json", append=False, **kwargs):
+    """
+    Daily JSON array or JSONL sink for output_base plus the format's extension; JSONL always appends.
+    With append, records whose id is already in the file are skipped.
+    """
+    if output_format == "json":
+        return DailyJsonWriter(f"{output_base}.json", append=append)
+    if output_format in ("jsonl", "jsonl.zst"):
+        return JsonlWriter(f"{output_base}.{output_format}", skip_existing=append, **kwargs)
+    raise ValueError(f"Unknown output format {output_format}, expected one of {', '.join(OUTPUT_FORMATS)}")
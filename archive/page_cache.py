@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+
+import gzip
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from html_parser import ParsedPage
+
+logger = logging.getLogger(__name__)
+
+# Constants
+CACHE_DIR = "page_cache"
+INDEX_FILE = "index.sqlite"
+
+# Seconds a snapshot stays fresh; None never expires
+TTLS: Dict[str, Optional[float]] = {
+    "finished": None,
+    "live": 30,
+    "scheduled": 3600,
+    "page": 3600,
+}
+DEFAULT_KIND = "page"
+
+FINISHED_STATUSES = {"Finished", "After Penalties", "After Extra Time", "Awarded"}
+MATCH_STATUS_RE = re.compile(r'class="detailScore__status"[^>]*>(?:<[^>]+>)*([^<]*)<')
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    kind TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_url ON pages (url, fetched_at);
+"""
+
+
+class CacheMiss(LookupError):
+    """No usable snapshot for a URL in replay mode"""
+
+
+def classify_match_page(html: str) -> str:
+    """finished or live, from the status line in the match header"""
+    match = MATCH_STATUS_RE.search(html)
+    if match and match.group(1).strip() in FINISHED_STATUSES:
+        return "finished"
+    return "live"
+
+
+class PageCache:
+    """
+    Compressed, content-addressed store of page sources and feed bodies, indexed by URL and fetch time.
+    Used by fetch_match_details (match tab snapshots) and http_backend (feed bodies); the listing
+    scrapers click through live pages and do not go through it.
+    """
+
+    def __init__(self, root: str = CACHE_DIR, ttls: Optional[Dict[str, Optional[float]]] = None,
+                 replay: bool = False):
+        self.root = root
+        self.ttls = dict(TTLS, **(ttls or {}))
+        self.replay = replay  # Serve whatever is cached, however old, and never expect the network
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(root, INDEX_FILE), check_same_thread=False)
+        self._db.executescript(INDEX_SCHEMA)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.gz")
+
+    def put(self, url: str, body: str, kind: str = DEFAULT_KIND) -> str:
+        """Store a body under its sha256 and record the fetch in the index"""
+        data = body.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        # Identical content (e.g. two reads of the same tab) is stored once
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO pages (url, fetched_at, kind, digest, size) VALUES (?, ?, ?, ?, ?)",
+                (url, time.time(), kind, digest, len(data))
+            )
+            self._db.commit()
+        return digest
+
+    def _latest(self, url: str):
+        with self._lock:
+            return self._db.execute(
+                "SELECT fetched_at, kind, digest FROM pages WHERE url = ? ORDER BY fetched_at DESC LIMIT 1",
+                (url,)
+            ).fetchone()
+
+    def _expired(self, fetched_at: float, kind: str) -> bool:
+        ttl = self.ttls.get(kind, self.ttls[DEFAULT_KIND])
+        return not self.replay and ttl is not None and time.time() - fetched_at > ttl
+
+    def fresh(self, url: str) -> bool:
+        """Whether get would return a body for a URL, without reading it"""
+        row = self._latest(url)
+        return row is not None and not self._expired(row[0], row[1])
+
+    def get(self, url: str) -> Optional[str]:
+        """Latest body for a URL, or None if absent or past its kind's TTL"""
+        row = self._latest(url)
+        if row is None:
+            self.misses += 1
+            return None
+
+        fetched_at, kind, digest = row
+        if self._expired(fetched_at, kind):
+            self.misses += 1
+            return None
+
+        try:
+            with gzip.open(self._object_path(digest), "rb") as f:
+                body = f.read().decode("utf-8")
+        except OSError as e:
+            logger.warning(f"Cache object {digest} for {url} unreadable: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return body
+
+    def load(self, url: str) -> str:
+        """Like get, but a miss is an error; used by replay paths"""
+        body = self.get(url)
+        if body is None:
+            raise CacheMiss(url)
+        return body
+
+    def snapshot(self, driver, url: str, kind: Optional[str] = None) -> ParsedPage:
+        """Read page_source once, cache it and hand back a detached copy for the parsers"""
+        html = driver.page_source
+        self.put(url, html, kind or classify_match_page(html))
+        return ParsedPage(html, url)
+
+    def urls(self, prefix: str = "") -> List[str]:
+        """Cached URLs starting with prefix, compared exactly (LIKE would fold case and treat _ as a wildcard)"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT DISTINCT url FROM pages WHERE substr(url, 1, ?) = ? ORDER BY url", (len(prefix), prefix)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def log_summary(self):
+        logger.info(f"Page cache: {self.hits} hits, {self.misses} misses")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
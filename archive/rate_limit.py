@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Constants
+BURST = 3                 # Requests that may go out back to back after a quiet spell
+BACKOFF_FACTOR = 0.5      # Rate multiplier on each 429 or block page
+MIN_RATE_FACTOR = 0.05    # Backoff never goes below this share of the configured rate
+RECOVERY_SECONDS = 300    # Calm time to climb from a backoff back to the configured rate
+LIMITER_DIR = "rate_limits"  # One state file per host, shared by every process on the machine
+
+BLOCK_STATUSES = {403, 429, 503}
+BLOCK_MARKERS = ("captcha", "access denied", "unusual traffic", "too many requests")
+
+
+def is_blocked(status: Optional[int] = None, body: Optional[str] = None) -> bool:
+    """Whether a response or page looks like throttling: 429/403/503 or a captcha/denial page"""
+    if status in BLOCK_STATUSES:
+        return True
+    if body:
+        text = body[:20000].lower()
+        return any(marker in text for marker in BLOCK_MARKERS)
+    return False
+
+
+def retry_after(headers) -> Optional[float]:
+    """Seconds from a Retry-After header, if it holds a number"""
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Token bucket: a steady request rate with short bursts, slowed down by backoff() on 429s and block pages.
+    With a state_file, every thread and process using that file draws from the same bucket and shares its
+    backoff. The file holds no rate of its own: each limiter refills at its configured rate times the shared
+    backoff factor, and its own bucket keeps it at that rate however fast the other users are.
+    """
+
+    def __init__(self, requests_per_second: float = 1.0, burst: float = BURST, state_file: Optional[str] = None):
+        self.base_rate = requests_per_second
+        self.burst = max(1.0, burst)
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self._state = self._initial_state()
+        self._own_tokens = self.burst
+        self._own_updated = time.time()
+
+    def _initial_state(self) -> Dict[str, float]:
+        return {"tokens": self.burst, "factor": 1.0, "updated": time.time(), "blocked_until": 0.0, "backoffs": 0}
+
+    @contextmanager
+    def _shared_state(self):
+        """The bucket state, read and written under a file lock when it is shared"""
+        with self._lock:
+            if not self.state_file:
+                yield self._state
+                return
+            with open(self.state_file, "a+", encoding="utf-8") as f:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    f.seek(0)
+                    body = f.read()
+                    try:
+                        state = json.loads(body) if body else self._initial_state()
+                    except ValueError:
+                        state = self._initial_state()
+                    yield state
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state))
+                    f.flush()
+                finally:
+                    if fcntl:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+                    else:
+                        f.seek(0)
+                        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _refill(self, state: Dict[str, float], now: float) -> float:
+        """Top up the shared and own buckets and return this limiter's current rate"""
+        state.pop("rate", None)  # Files from before the factor was shared
+        elapsed = max(0.0, now - state["updated"])
+        # Additive recovery after a multiplicative backoff
+        state["factor"] = min(1.0, state.get("factor", 1.0) + elapsed / RECOVERY_SECONDS)
+        rate = self.base_rate * state["factor"]
+        state["tokens"] = min(self.burst, state["tokens"] + elapsed * rate)
+        state["updated"] = now
+        self._own_tokens = min(self.burst, self._own_tokens + max(0.0, now - self._own_updated) * rate)
+        self._own_updated = now
+        return rate
+
+    def wait(self):
+        """Block until a token is available and take it"""
+        if self.base_rate <= 0:
+            return
+        while True:
+            with self._shared_state() as state:
+                now = time.time()
+                rate = self._refill(state, now)
+                tokens = min(state["tokens"], self._own_tokens)
+                if now >= state["blocked_until"] and tokens >= 1:
+                    state["tokens"] -= 1
+                    self._own_tokens -= 1
+                    return
+                delay = max(state["blocked_until"] - now, (1 - tokens) / rate)
+            time.sleep(delay)
+
+    def backoff(self, pause: Optional[float] = None):
+        """Cut the rate after a 429 or block page, and pause everyone for pause seconds (e.g. Retry-After)"""
+        with self._shared_state() as state:
+            now = time.time()
+            self._refill(state, now)
+            state["factor"] = max(MIN_RATE_FACTOR, state["factor"] * BACKOFF_FACTOR)
+            state["tokens"] = 0.0
+            self._own_tokens = 0.0
+            if pause:
+                state["blocked_until"] = max(state["blocked_until"], now + pause)
+            state["backoffs"] += 1
+            rate = self.base_rate * state["factor"]
+        logger.warning(f"Throttled: rate down to {rate:.2f} req/s" + (f", pausing {pause:.1f}s" if pause else ""))
+
+    @property
+    def rate(self) -> float:
+        """Current requests per second, below the configured rate while recovering from a backoff"""
+        return self.stats()["rate"]
+
+    def stats(self) -> Dict[str, float]:
+        with self._shared_state() as state:
+            rate = self._refill(state, time.time())
+            return {"rate": round(rate, 3), "base_rate": self.base_rate, "factor": round(state["factor"], 3),
+                    "tokens": round(min(state["tokens"], self._own_tokens), 2), "backoffs": state["backoffs"]}
+
+
+# (host, rate, burst, shared_dir) -> limiter; callers asking for another rate get their own limiter on the same file
+_host_limiters: Dict[Tuple[str, float, float, Optional[str]], RateLimiter] = {}
+_host_lock = threading.Lock()
+
+
+def for_host(url: str, requests_per_second: float, burst: float = BURST,
+             shared_dir: Optional[str] = LIMITER_DIR) -> RateLimiter:
+    """
+    The limiter for a URL's host at a rate, sharing shared_dir/<host>.json and so its backoff with every
+    other limiter for that host, in any process (None: this process only)
+    """
+    host = urlsplit(url).netloc or url
+    key = (host, requests_per_second, burst, shared_dir)
+    with _host_lock:
+        if key not in _host_limiters:
+            state_file = None
+            if shared_dir:
+                os.makedirs(shared_dir, exist_ok=True)
+                state_file = os.path.join(shared_dir, f"{host.replace(':', '_')}.json")
+            _host_limiters[key] = RateLimiter(requests_per_second, burst, state_file)
+        return _host_limiters[key]
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+import json
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Constants
+# We only read text nodes, so images, fonts, media, ads and trackers are dead weight
+DEFAULT_BLOCKED_URLS = [
+    # Images
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.avif",
+    # Fonts
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # Media
+    "*.mp4", "*.webm",
+    # Ads and trackers
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*adservice.google.*", "*amazon-adsystem.com*",
+    "*facebook.net*", "*hotjar.com*", "*scorecardresearch.com*", "*criteo.*",
+    "*taboola.com*", "*outbrain.com*", "*adnxs.com*", "*rubiconproject.com*",
+    "*pubmatic.com*", "*casalemedia.com*",
+]
+
+# Used to estimate savings when no request of that type was allowed through
+DEFAULT_RESOURCE_BYTES = {
+    "Image": 25_000,
+    "Font": 40_000,
+    "Media": 500_000,
+    "Script": 60_000,
+    "Stylesheet": 20_000,
+    "Other": 5_000,
+}
+
+
+def enable_performance_logging(options):
+    """Ask ChromeDriver to record network events needed for the savings report"""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def enable_resource_blocking(driver, blocked_urls: Optional[Iterable[str]] = None):
+    """Block URL patterns for every subsequent request through CDP"""
+    patterns = list(blocked_urls if blocked_urls is not None else DEFAULT_BLOCKED_URLS)
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+    logger.info(f"Blocking {len(patterns)} URL patterns")
+
+
+class BlockingReport:
+    """Collects per-run request and byte counts from the performance log"""
+
+    def __init__(self):
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+        self.blocked = Counter()
+        self.bytes_by_type: Dict[str, int] = Counter()
+        self.count_by_type: Dict[str, int] = Counter()
+        self._lock = threading.Lock()
+
+    def collect(self, driver):
+        """Drain the driver's performance log into the counters; a dead driver is skipped, never raised from"""
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            # A dead chromedriver raises urllib3 errors, not WebDriverException
+            logger.debug(f"Could not read performance log: {e}")
+            return
+
+        types = {}
+        finished = []
+        blocked = []
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                types[params.get('requestId')] = params.get('type', 'Other')
+            elif method == 'Network.loadingFinished':
+                finished.append(params)
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                blocked.append(params)
+
+        with self._lock:
+            for params in finished:
+                resource_type = types.get(params.get('requestId'), 'Other')
+                size = int(params.get('encodedDataLength', 0))
+                self.loaded_requests += 1
+                self.loaded_bytes += size
+                self.bytes_by_type[resource_type] += size
+                self.count_by_type[resource_type] += 1
+            for params in blocked:
+                self.blocked[params.get('type') or types.get(params.get('requestId'), 'Other')] += 1
+
+    def estimated_bytes_saved(self) -> int:
+        """Blocked requests times the average size seen for their type"""
+        total = 0
+        for resource_type, count in self.blocked.items():
+            if self.count_by_type.get(resource_type):
+                average = self.bytes_by_type[resource_type] / self.count_by_type[resource_type]
+            else:
+                average = DEFAULT_RESOURCE_BYTES.get(resource_type, DEFAULT_RESOURCE_BYTES["Other"])
+            total += int(average * count)
+        return total
+
+    def summary(self) -> dict:
+        with self._lock:
+            stats = {
+                "requests_loaded": self.loaded_requests,
+                "bytes_loaded": self.loaded_bytes,
+                "requests_blocked": sum(self.blocked.values()),
+                "blocked_by_type": dict(self.blocked),
+                "bytes_saved_estimate": self.estimated_bytes_saved(),
+            }
+        return stats
+
+    def log_summary(self):
+        logger.info(f"Resource blocking report: {self.summary()}")
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+
+import logging
+import random
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, NamedTuple, Optional, Tuple
+
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    InvalidSessionIdException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from rate_limit import RateLimiter, is_blocked
+
+logger = logging.getLogger(__name__)
+
+# Failure classes
+TRANSIENT_DOM = "transient_dom"             # Element went stale or is not there yet: look it up again
+NAVIGATION_TIMEOUT = "navigation_timeout"   # Page or selector did not arrive in time: reload
+DRIVER_CRASH = "driver_crash"               # Browser or chromedriver is gone: start a new one
+BLOCKED = "blocked"                         # Captcha, denial or 429 page: slow every worker down
+
+# Messages of WebDriverExceptions raised when the browser itself has died
+DRIVER_GONE_MARKERS = (
+    "chrome not reachable", "disconnected", "session deleted", "no such session", "target window already closed",
+    "tab crashed", "max retries exceeded", "connection refused",
+)
+
+
+class RetryRule(NamedTuple):
+    base_delay: float       # Seconds before the first retry, doubled on each further one
+    max_delay: float
+    jitter: float           # +/- share of the delay, so workers do not retry in lockstep
+    max_attempts: int
+    breaker_threshold: int  # Failures of this class within BREAKER_WINDOW that open its circuit
+
+    def delay(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+RULES: Dict[str, RetryRule] = {
+    TRANSIENT_DOM: RetryRule(0.2, 2, 0.5, 5, 30),
+    NAVIGATION_TIMEOUT: RetryRule(2, 30, 0.5, 4, 8),
+    DRIVER_CRASH: RetryRule(1, 10, 0.3, 3, 4),
+    BLOCKED: RetryRule(30, 600, 0.3, 3, 2),
+}
+BREAKER_WINDOW = 300        # Seconds a call's outcome counts towards opening a circuit
+BREAKER_COOLDOWN = 600      # Seconds an open circuit refuses calls before letting one trial through
+BREAKER_FAILURE_RATE = 0.5  # Share of the calls in the window that must have failed, besides the threshold
+
+
+class BlockedPage(WebDriverException):
+    """The site served a captcha, denial or rate-limit page instead of content"""
+
+
+class RetryExhausted(Exception):
+    def __init__(self, failure: str, error: Exception):
+        super().__init__(f"Gave up after repeated {failure} failures: {error}")
+        self.failure = failure
+        self.error = error
+
+
+class CircuitOpen(Exception):
+    def __init__(self, failure: str, seconds: float):
+        super().__init__(f"Circuit for {failure} failures is open for another {seconds:.0f}s")
+        self.failure = failure
+        self.seconds = seconds
+
+
+def classify(error: Exception, driver=None) -> Optional[str]:
+    """Failure class of an exception, or None for errors retrying cannot fix"""
+    if isinstance(error, BlockedPage):
+        return BLOCKED
+    if isinstance(error, (StaleElementReferenceException, NoSuchElementException,
+                          ElementNotInteractableException, ElementClickInterceptedException)):
+        return TRANSIENT_DOM
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException, ConnectionError)):
+        return DRIVER_CRASH
+    if isinstance(error, TimeoutException):
+        # A timeout waiting for rows is often a block page that never renders them
+        try:
+            if driver is not None and is_blocked(body=driver.page_source):
+                return BLOCKED
+        except WebDriverException:
+            return DRIVER_CRASH
+        return NAVIGATION_TIMEOUT
+    # urllib3 errors from a dead chromedriver are not WebDriverExceptions, but say so in their message
+    message = str(error).lower()
+    if any(marker in message for marker in DRIVER_GONE_MARKERS):
+        return DRIVER_CRASH
+    if isinstance(error, WebDriverException):
+        return NAVIGATION_TIMEOUT
+    return None
+
+
+class CircuitBreaker:
+    """
+    Opens once threshold calls within window seconds failed and they are at least failure_rate of the calls
+    there; after the cooldown exactly one trial call decides whether it closes or opens again
+    """
+
+    def __init__(self, failure: str, threshold: int, window: float = BREAKER_WINDOW,
+                 cooldown: float = BREAKER_COOLDOWN, failure_rate: float = BREAKER_FAILURE_RATE):
+        self.failure = failure
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.failure_rate = failure_rate
+        self.outcomes: Deque[Tuple[float, bool]] = deque()  # (time, failed) of each call in the window
+        self.opened_at: Optional[float] = None
+        self.trial = False  # A caller holds the half-open trial
+        self._lock = threading.Lock()
+
+    def _record(self, now: float, failed: bool) -> int:
+        """Add an outcome, drop the ones past the window and return the failures left"""
+        self.outcomes.append((now, failed))
+        while self.outcomes and self.outcomes[0][0] < now - self.window:
+            self.outcomes.popleft()
+        return sum(failed for _, failed in self.outcomes)
+
+    def check(self) -> bool:
+        """
+        Raise CircuitOpen while open. Once the cooldown is over, the first caller gets True and is the trial;
+        the others are refused until it reports back
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining > 0 or self.trial:
+                raise CircuitOpen(self.failure, max(0.0, remaining))
+            self.trial = True
+            return True
+
+    def record_failure(self, trial: bool = False):
+        with self._lock:
+            now = time.monotonic()
+            failures = self._record(now, True)
+            if trial:
+                # A failed trial reopens straight away
+                self.trial = False
+                self.opened_at = now
+                logger.error(f"Circuit for {self.failure} failures reopened for {self.cooldown:.0f}s")
+            elif (self.opened_at is None and failures >= self.threshold
+                  and failures >= self.failure_rate * len(self.outcomes)):
+                self.opened_at = now
+                logger.error(f"Circuit for {self.failure} failures opened for {self.cooldown:.0f}s")
+
+    def record_success(self, trial: bool = False):
+        """Count a call that did not end in this failure; only the trial closes an open circuit"""
+        with self._lock:
+            self._record(time.monotonic(), False)
+            if trial:
+                self.trial = False
+                self.opened_at = None
+                logger.info(f"Circuit for {self.failure} failures closed")
+
+    def release(self, trial: bool):
+        """Give up a trial that ended without a verdict, so the next caller can be the trial"""
+        if trial:
+            with self._lock:
+                self.trial = False
+
+
+class RetryPolicy:
+    """Retries a driver operation with per-failure-class backoff, recovery action and circuit breaker"""
+
+    def __init__(self, limiter: Optional[RateLimiter] = None, rules: Dict[str, RetryRule] = RULES):
+        self.limiter = limiter
+        self.rules = rules
+        self.breakers = {failure: CircuitBreaker(failure, rule.breaker_threshold) for failure, rule in rules.items()}
+        self.counts = Counter()
+
+    def run(self, operation: Callable[[Any], Any], driver, restart: Optional[Callable[[Any], Any]] = None,
+            navigates: bool = False) -> Tuple[Any, Any]:
+        """
+        Call operation(driver) until it succeeds and return (result, driver); recovery may have replaced
+        the driver. restart(driver) must return a working driver; navigates says the operation loads its
+        own page, so a timeout is not followed by a reload. Raises RetryExhausted, CircuitOpen, or the
+        original error when it is not retryable.
+        """
+        attempts = Counter()
+        trials: Dict[str, bool] = {}  # Failure class -> whether this call holds its breaker's trial
+        try:
+            while True:
+                # A block page throttles the whole site, so an open BLOCKED circuit stops every call. The other
+                # classes' circuits only stop retries of their own failures
+                if not trials.get(BLOCKED):
+                    trials[BLOCKED] = self.breakers[BLOCKED].check()
+                try:
+                    result = operation(driver)
+                except Exception as e:
+                    failure = classify(e, driver)
+                    if failure is None:
+                        raise
+                    self.counts[failure] += 1
+                    attempts[failure] += 1
+                    rule = self.rules[failure]
+                    breaker = self.breakers[failure]
+                    breaker.record_failure(trials.pop(failure, False))
+                    if attempts[failure] >= rule.max_attempts:
+                        raise RetryExhausted(failure, e) from e
+                    # Past the cooldown, this retry is the trial for its class
+                    trials[failure] = breaker.check()
+                    delay = rule.delay(attempts[failure])
+                    logger.warning(f"{failure} (attempt {attempts[failure]}/{rule.max_attempts}): {e}; "
+                                   f"recovering in {delay:.1f}s")
+                    driver = self.recover(failure, driver, delay, restart, navigates)
+                    continue
+                # Every class counts the success, which dilutes its failures in the window instead of clearing them
+                for failure, breaker in self.breakers.items():
+                    breaker.record_success(trials.pop(failure, False))
+                return result, driver
+        finally:
+            for failure, trial in trials.items():
+                self.breakers[failure].release(trial)
+
+    def recover(self, failure: str, driver, delay: float, restart: Optional[Callable[[Any], Any]] = None,
+                navigates: bool = False):
+        """Re-query, reload, recycle the driver, or slow everyone down, depending on the failure class"""
+        if failure == BLOCKED:
+            # The shared bucket pauses every worker, not just this one
+            if self.limiter:
+                self.limiter.backoff(delay)
+            else:
+                time.sleep(delay)
+            return driver
+
+        time.sleep(delay)
+        if failure == TRANSIENT_DOM or (failure == NAVIGATION_TIMEOUT and navigates):
+            return driver
+        if failure == NAVIGATION_TIMEOUT:
+            try:
+                if self.limiter:
+                    self.limiter.wait()
+                driver.refresh()
+                return driver
+            except WebDriverException as e:
+                logger.warning(f"Reload failed, recycling the driver: {e}")
+        if restart is None:
+            raise RetryExhausted(DRIVER_CRASH, RuntimeError("No way to restart the driver"))
+        logger.info("Recycling the driver")
+        return restart(driver)
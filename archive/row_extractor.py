@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Reads every match row in one execute_script call instead of one find_element per field.
+# With onlyNew, rows already read are skipped and the ones read now are marked; with prune they are
+# hidden as well so a fully expanded season does not keep thousands of rows laid out. Their text stays
+# in the DOM for any later full read.
+EXTRACT_MATCH_ROWS_JS = """
+    var root = arguments[0] || document;
+    var onlyNew = arguments[1];
+    var prune = arguments[2];
+    function text(row, selector) {
+        var el = row.querySelector(selector);
+        return el ? el.innerText.trim() : null;
+    }
+    function count(row, selector) {
+        return row.querySelectorAll(selector).length;
+    }
+    var rows = [];
+    root.querySelectorAll(onlyNew ? '.event__match:not([data-extracted])' : '.event__match').forEach(function(row) {
+        var possession = Array.prototype.map.call(
+            row.querySelectorAll('.event__possession'),
+            function(el) { return el.innerText.trim(); }
+        );
+        rows.push({
+            id: row.getAttribute('id'),
+            date: text(row, '.event__time'),
+            home_team: text(row, '.event__participant--home'),
+            away_team: text(row, '.event__participant--away'),
+            home_score: text(row, '.event__score--home'),
+            away_score: text(row, '.event__score--away'),
+            possession: possession,
+            home_cards: count(row, '.event__card.event__card--home'),
+            away_cards: count(row, '.event__card.event__card--away'),
+            home_corners: count(row, '.event__corner.event__corner--home'),
+            away_corners: count(row, '.event__corner.event__corner--away')
+        });
+        if (onlyNew) {
+            row.setAttribute('data-extracted', '1');
+        }
+        if (prune) {
+            row.style.display = 'none';
+        }
+    });
+    return rows;
+"""
+
+# Clicks "Show more matches" if it is displayed; returns false at once when there is nothing left to load
+CLICK_SHOW_MORE_JS = """
+    var button = document.querySelector('.event__more');
+    if (!button || button.offsetParent === null) {
+        return false;
+    }
+    button.click();
+    return true;
+"""
+
+REQUIRED_FIELDS = ("date", "home_team", "away_team", "home_score", "away_score")
+
+
+def extract_match_rows(driver, root=None) -> List[Dict[str, Any]]:
+    """Return the raw fields of every .event__match row in a single round trip"""
+    return driver.execute_script(EXTRACT_MATCH_ROWS_JS, root, False, False) or []
+
+
+def extract_new_rows(driver, prune: bool = False, root=None) -> List[Dict[str, Any]]:
+    """Return only the rows appended since the last call, marking them as read"""
+    return driver.execute_script(EXTRACT_MATCH_ROWS_JS, root, True, prune) or []
+
+
+def click_show_more(driver) -> bool:
+    """Click "Show more matches"; False when the button is gone or hidden"""
+    return bool(driver.execute_script(CLICK_SHOW_MORE_JS))
+
+
+def row_statistics(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the possession/cards/corners dict the per-element lookups used to return"""
+    stats = {}
+
+    possession = row.get("possession") or []
+    if possession:
+        stats["possession"] = {
+            "home": possession[0] if len(possession) > 0 else None,
+            "away": possession[1] if len(possession) > 1 else None
+        }
+
+    if row.get("home_cards") or row.get("away_cards"):
+        stats["cards"] = {"home": row["home_cards"], "away": row["away_cards"]}
+
+    if row.get("home_corners") or row.get("away_corners"):
+        stats["corners"] = {"home": row["home_corners"], "away": row["away_corners"]}
+
+    return stats
+
+
+def is_complete(row: Dict[str, Any]) -> bool:
+    """A result row needs a date, both teams and both scores"""
+    missing = [field for field in REQUIRED_FIELDS if row.get(field) is None]
+    if missing:
+        logger.error(f"Match row {row.get('id')} is missing {', '.join(missing)}")
+        return False
+    return True
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+import logging
+import re
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Constants
+# Display label -> stable stat ID. IDs never change; add new labels (or renamed ones) as extra keys.
+STAT_LABELS = {
+    "Expected Goals (xG)": "xg",
+    "Expected assists (xA)": "xa",
+    "xG on target (xGOT)": "xgot",
+    "xGOT faced": "xgot_faced",
+    "Ball Possession": "possession",
+    "Total shots": "shots_total",
+    "Shots on target": "shots_on_target",
+    "Shots off target": "shots_off_target",
+    "Blocked Shots": "shots_blocked",
+    "Shots inside the Box": "shots_inside_box",
+    "Shots outside the Box": "shots_outside_box",
+    "Big Chances": "big_chances",
+    "Hit the Woodwork": "woodwork",
+    "Headed Goals": "headed_goals",
+    "Corner Kicks": "corners",
+    "Offsides": "offsides",
+    "Free Kicks": "free_kicks",
+    "Throw-ins": "throw_ins",
+    "Fouls": "fouls",
+    "Yellow Cards": "yellow_cards",
+    "Red Cards": "red_cards",
+    "Goalkeeper Saves": "saves",
+    "Goals prevented": "goals_prevented",
+    "Passes": "passes",
+    "Long passes": "long_passes",
+    "Passes in final third": "passes_final_third",
+    "Accurate through passes": "through_passes",
+    "Crosses": "crosses",
+    "Touches in opposition box": "touches_opposition_box",
+    "Tackles": "tackles",
+    "Duels won": "duels_won",
+    "Interceptions": "interceptions",
+    "Clearances": "clearances",
+    "Errors leading to shot": "errors_to_shot",
+    "Errors leading to goal": "errors_to_goal",
+}
+
+# Labels are matched case- and whitespace-insensitively
+_LOOKUP = {re.sub(r'\s+', ' ', label).strip().lower(): stat_id for label, stat_id in STAT_LABELS.items()}
+_unknown_logged = set()
+
+
+def slug(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+
+
+def stat_id(label: str) -> str:
+    """Stable ID for a display label; unknown labels fall back to a slug and are logged once"""
+    key = re.sub(r'\s+', ' ', label).strip().lower()
+    if key in _LOOKUP:
+        return _LOOKUP[key]
+    if label not in _unknown_logged:
+        _unknown_logged.add(label)
+        logger.warning(f"Stat label {label!r} is not in STAT_LABELS; using {slug(label)!r}")
+    return slug(label)
+
+
+def keyed_statistics(rows: Iterable[Dict[str, Optional[str]]]) -> Dict[str, Dict[str, Optional[str]]]:
+    """One entry per stat ID from {label, home_value, away_value} rows; the detailed row replaces the top-stats copy"""
+    keyed = {}
+    for row in rows:
+        # The top-stats section comes first on the page, so the later detailed row wins
+        keyed[stat_id(row["label"])] = row
+    return keyed
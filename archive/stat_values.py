@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+import logging
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+try:
+    import pandas as pd
+except ImportError:  # The scrapers only need parse_value; the vectorized normalize needs pandas
+    pd = None
+
+from stat_labels import keyed_statistics
+
+logger = logging.getLogger(__name__)
+
+# Constants
+# "73%", "1.44", "17" and compound "91%(549/601)"
+VALUE_PATTERN = (
+    r'^\s*(?P<value>-?\d+(?:\.\d+)?)\s*(?P<percent>%)?'
+    r'\s*(?:\(\s*(?P<numerator>\d+)\s*/\s*(?P<denominator>\d+)\s*\))?\s*$'
+)
+VALUE_RE = re.compile(VALUE_PATTERN)
+SIDES = ("home", "away")
+FAILURE_SAMPLES = 5
+
+_unparseable_logged = set()
+
+
+class ParseReport:
+    """Counts of parsed and unparseable stat values, so nothing is dropped silently"""
+
+    def __init__(self):
+        self.total = 0
+        self.failed = 0
+        self.failures_by_label = Counter()
+        self.samples = {}
+
+    def add(self, frame: "pd.DataFrame", failed: "pd.Series"):
+        self.total += int(frame["raw"].notna().sum())
+        self.failed += int(failed.sum())
+        bad = frame[failed]
+        self.failures_by_label.update(bad["label"].tolist())
+        for label, raw in zip(bad["label"], bad["raw"]):
+            samples = self.samples.setdefault(label, [])
+            if len(samples) < FAILURE_SAMPLES and raw not in samples:
+                samples.append(raw)
+
+    def log_summary(self):
+        logger.info(f"Stat values: {self.total - self.failed}/{self.total} parsed, {self.failed} failed")
+        for label, count in self.failures_by_label.most_common():
+            logger.warning(f"Unparseable {label!r} x{count}, e.g. {self.samples[label]}")
+
+
+def stat_frame(records: Iterable[Dict[str, Any]]) -> "pd.DataFrame":
+    """Long table of raw stat strings: one row per match, period, stat and side"""
+    rows = []
+    for match, record in enumerate(records):
+        for period, stats in (record.get("statistics") or {}).items():
+            # Keyed by stat ID since extraction-time dedup; older archive files hold plain lists with
+            # the top stats repeated, keyed the same way so the detailed row wins there too
+            keyed = stats if isinstance(stats, dict) else keyed_statistics(stats)
+            for stat, row in keyed.items():
+                for side in SIDES:
+                    rows.append((match, period, stat, row["label"], side, row.get(f"{side}_value")))
+    return pd.DataFrame(rows, columns=["match", "period", "stat", "label", "side", "raw"])
+
+
+def normalize(frame: "pd.DataFrame", report: Optional[ParseReport] = None) -> "pd.DataFrame":
+    """Add typed value, is_percent, numerator and denominator columns in one vectorized pass"""
+    raw = frame["raw"].astype("string")
+    parts = raw.str.extract(VALUE_PATTERN)
+
+    frame = frame.assign(
+        value=pd.to_numeric(parts["value"]),
+        is_percent=parts["percent"].notna(),
+        numerator=pd.to_numeric(parts["numerator"]),
+        denominator=pd.to_numeric(parts["denominator"]),
+    )
+
+    # Blank or missing values are absent stats, not parse failures
+    failed = (raw.str.strip().fillna("") != "") & frame["value"].isna()
+    frame["parsed"] = ~failed
+    if report is not None:
+        report.add(frame, failed.fillna(False).astype(bool))
+    return frame
+
+
+def parse_value(raw: Optional[str], label: str = "") -> Optional[Dict[str, Any]]:
+    """One stat string typed the way normalize types a column; None when blank or unparseable (logged once per label)"""
+    if raw is None or not raw.strip():
+        return None
+    match = VALUE_RE.match(raw)
+    if match is None:
+        if label not in _unparseable_logged:
+            _unparseable_logged.add(label)
+            logger.warning(f"Unparseable {label!r} value {raw!r}")
+        return None
+    return {
+        "value": float(match.group("value")),
+        "is_percent": match.group("percent") is not None,
+        "numerator": int(match.group("numerator")) if match.group("numerator") else None,
+        "denominator": int(match.group("denominator")) if match.group("denominator") else None,
+    }
+
+
+def typed_statistics(keyed: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Add home_parsed/away_parsed to each keyed stat row, so the scraper output carries typed values"""
+    for row in keyed.values():
+        for side in SIDES:
+            row[f"{side}_parsed"] = parse_value(row.get(f"{side}_value"), row["label"])
+    return keyed
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+
+import argparse
+import json
+import logging
+import os
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from output_writers import read_latest
+from stat_labels import slug
+from stat_values import ParseReport, normalize, stat_frame
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+STORE_DIR = "stats_store"
+UNKNOWN_LEAGUE = "unknown"
+DATE_FILE_RE = re.compile(r'(\d{4}-\d{2}-\d{2})\.jsonl?(\.zst)?$')
+
+# Match-level columns; every other column is <period>__<stat ID>__<side> as float64,
+# plus _num/_den columns for compound values such as "91%(549/601)"
+MATCH_COLUMNS = [
+    ("match_id", pa.string()),
+    ("date", pa.string()),
+    ("league", pa.string()),
+    ("tournament", pa.string()),
+    ("home_team", pa.string()),
+    ("away_team", pa.string()),
+    ("final_result", pa.string()),
+    ("man_of_the_match", pa.string()),
+]
+PARTITION_COLUMNS = ("date", "league")
+
+
+def league_of(record: Dict[str, Any]) -> str:
+    """Partition key from "ENGLAND: Premier League - Round 36" style tournament strings"""
+    tournament = record.get("tournament")
+    if not tournament:
+        return UNKNOWN_LEAGUE
+    return slug(tournament.split(" - ")[0]) or UNKNOWN_LEAGUE
+
+
+def stat_column(period: str, stat: str, side: str) -> str:
+    return f"{period}__{stat}__{side}"
+
+
+def match_columns(record: Dict[str, Any], date: str, index: int) -> Dict[str, Any]:
+    """Match-level columns of one daily-output record"""
+    score = record.get("score") or {}
+    row = {
+        "match_id": record.get("id") or f"{date}-{index}",
+        "date": date,
+        "league": league_of(record),
+        "tournament": record.get("tournament"),
+        "home_team": record.get("home_team"),
+        "away_team": record.get("away_team"),
+        "final_result": score.get("final_result") if isinstance(score, dict) else score,
+        "man_of_the_match": record.get("man_of_the_match"),
+    }
+    return row
+
+
+def stat_columns(stats) -> Dict[int, Dict[str, Optional[float]]]:
+    """Wide typed stat columns per match index from the normalized long table"""
+    if stats.empty:
+        return {}
+    # stat_frame already holds one row per stat ID (keyed_statistics), so the pivot has no duplicates
+    stats = stats.assign(column=[
+        stat_column(period, stat, side) for period, stat, side in zip(stats["period"], stats["stat"], stats["side"])
+    ])
+
+    wide = stats.pivot(index="match", columns="column", values="value")
+    compound = stats[stats["denominator"].notna()]
+    if not compound.empty:
+        wide = wide.join(compound.pivot(index="match", columns="column", values="numerator").add_suffix("_num"))
+        wide = wide.join(compound.pivot(index="match", columns="column", values="denominator").add_suffix("_den"))
+
+    wide = wide.astype(object).where(wide.notna(), None)
+    return wide.to_dict("index")
+
+
+def table_schema(rows: List[Dict[str, Any]]) -> pa.Schema:
+    """Fixed match columns plus the union of stat columns seen in this batch"""
+    fixed = {name for name, _ in MATCH_COLUMNS}
+    stat_columns = sorted({key for row in rows for key in row if key not in fixed})
+    return pa.schema(MATCH_COLUMNS + [(name, pa.float64()) for name in stat_columns])
+
+
+def write_partition(rows: List[Dict[str, Any]], date: str, league: str, root: str = STORE_DIR,
+                    part: str = "part-0") -> str:
+    """Write rows to <root>/date=<date>/league=<league>/<part>.parquet, replacing a previous run of the same part"""
+    directory = os.path.join(root, f"date={date}", f"league={league}")
+    os.makedirs(directory, exist_ok=True)
+    # Partition values live in the directory names, not in the files
+    table = pa.Table.from_pylist(rows, schema=table_schema(rows)).drop(list(PARTITION_COLUMNS))
+    path = os.path.join(directory, f"{part}.parquet")
+    pq.write_table(table, path, compression="zstd")
+    return path
+
+
+def store_records(records: Iterable[Dict[str, Any]], date: str, root: str = STORE_DIR,
+                  part: str = "part-0", report: Optional[ParseReport] = None) -> int:
+    """Split one day's records by league and write a partition for each"""
+    records = list(records)
+    # Every stat string of the day is parsed in one vectorized pass
+    stats = stat_columns(normalize(stat_frame(records), report))
+
+    by_league = defaultdict(list)
+    for index, record in enumerate(records):
+        row = match_columns(record, date, index) | stats.get(index, {})
+        by_league[row["league"]].append(row)
+
+    for league, rows in by_league.items():
+        path = write_partition(rows, date, league, root, part)
+        logger.info(f"Wrote {len(rows)} matches to {path}")
+    return sum(len(rows) for rows in by_league.values())
+
+
+def read_records(path: str) -> List[Dict[str, Any]]:
+    """Records from a daily JSON array or a JSONL output file, keeping the last copy of each match"""
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return read_latest(path)
+
+
+def backfill(paths: Iterable[str], root: str = STORE_DIR) -> int:
+    """Convert existing daily output files (YYYY-MM-DD.json / .jsonl) into the store"""
+    total = 0
+    report = ParseReport()
+    for path in paths:
+        match = DATE_FILE_RE.search(os.path.basename(path))
+        if not match:
+            logger.warning(f"Skipping {path}: no YYYY-MM-DD date in the file name")
+            continue
+        try:
+            records = read_records(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading {path}: {e}")
+            continue
+        # One part per source file, so re-running the backfill replaces rather than duplicates
+        total += store_records(records, match.group(1), root, os.path.basename(path).split(".")[0], report)
+    report.log_summary()
+    logger.info(f"Backfilled {total} matches into {root}")
+    return total
+
+
+def load(root: str = STORE_DIR, columns: Optional[List[str]] = None, filter=None):
+    """Read only the requested columns (and partitions, via a ds.field filter) into a pandas DataFrame"""
+    dataset = ds.dataset(root, format="parquet", partitioning="hive")
+    # Leagues track different stats, so unify the file schemas instead of trusting the first file
+    schema = pa.unify_schemas([dataset.schema] + [f.physical_schema for f in dataset.get_fragments()])
+    dataset = ds.dataset(root, schema=schema, format="parquet", partitioning="hive")
+    return dataset.to_table(columns=columns, filter=filter).to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert daily match output into a Parquet store partitioned by date and league")
+    parser.add_argument("paths", nargs="+", help="Daily output files, e.g. 2025-05-*.json")
+    parser.add_argument("--store", type=str, default=STORE_DIR, help="Root directory of the store")
+    args = parser.parse_args()
+
+    backfill(args.paths, args.store)
+
+
+if __name__ == "__main__":
+    main()
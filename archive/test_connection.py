@@ -7,6 +7,8 @@ from selenium.common.exceptions import TimeoutException
 import time
 import os
 
+import flashscore_selectors as sel
+
 def test_flashscore_elements():
     print("Starting Flashscore element test...")
     
@@ -32,12 +34,12 @@ def test_flashscore_elements():
             
             # Test different element selectors
             selectors_to_test = [
-                ('div.event__match', "Match elements"),
-                ('div.tournament__country', "Tournament country sections"),
-                ('div.sportName', "Sport name sections"),
-                ('div.event__participant', "Team names"),
-                ('div.event__time', "Match times"),
-                ('div.event__score', "Match scores")
+                (sel.MATCH_ROW.css, "Match elements"),
+                (sel.TOURNAMENT_COUNTRY.css, "Tournament country sections"),
+                (sel.SPORT_SECTION.css, "Sport name sections"),
+                (sel.PARTICIPANT.css, "Team names"),
+                (sel.ROW_TIME.css, "Match times"),
+                (sel.ROW_SCORE.css, "Match scores")
             ]
             
             print("\nTesting element selectors:")
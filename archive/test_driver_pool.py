@@ -0,0 +1,67 @@
+import pytest
+
+pytest.importorskip("selenium")
+pytest.importorskip("webdriver_manager")
+
+from urllib3.exceptions import MaxRetryError
+
+from driver_pool import DriverPool
+
+
+class DeadDriver:
+    """A browser whose chromedriver is gone: every call fails the way selenium's HTTP client does"""
+
+    def __init__(self):
+        self.quit_called = False
+
+    def _refused(self, *args, **kwargs):
+        raise MaxRetryError(None, "/session/dead", "Connection refused")
+
+    get_log = execute_script = get = _refused
+
+    def quit(self):
+        self.quit_called = True
+        self._refused()
+
+
+class LiveDriver:
+    def get_log(self, kind):
+        return []
+
+    def execute_script(self, script, *args):
+        return 1
+
+    def quit(self):
+        pass
+
+
+def make_pool(*drivers):
+    launched = iter(drivers)
+    return DriverPool(size=1, factory=lambda **kwargs: next(launched), consent_cookies=None, blocked_urls=None)
+
+
+def test_restart_replaces_a_driver_whose_log_cannot_be_read():
+    dead, fresh = DeadDriver(), LiveDriver()
+    pool = make_pool(dead, fresh)
+    pool.start()
+    pooled = pool.acquire()
+
+    assert pool.restart(pooled) is pooled
+    assert pooled._driver is fresh
+    assert dead.quit_called
+    assert not pooled.broken
+    pool.release(pooled)
+    pool.close()
+
+
+def test_release_of_a_dead_driver_keeps_the_original_error_and_the_slot():
+    fresh = LiveDriver()
+    pool = make_pool(DeadDriver(), fresh)
+    pool.start()
+
+    with pytest.raises(ValueError):
+        with pool.driver():
+            raise ValueError("scrape failed")
+
+    assert pool.acquire(timeout=1)._driver is fresh
+    pool.close()
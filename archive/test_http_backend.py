@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("httpx")
+pytest.importorskip("bs4")
+
+from feed_replay_server import serve
+from http_backend import COMMENTARY_FEED, MATCH_FEED, STATISTICS_FEED, FeedClient
+
+MATCH_ID = "Mx1y2z3A"
+RECORDINGS = {
+    MATCH_FEED.format(match_id=MATCH_ID): (
+        "SA÷1¬~ZA÷ENGLAND: Premier League¬ZEE÷dYlOSQOD¬~"
+        "AA÷Mx1y2z3A¬AD÷1746633600¬AB÷3¬AE÷Chelsea¬AF÷Arsenal¬AG÷2¬AH÷1¬~"
+    ),
+    STATISTICS_FEED.format(match_id=MATCH_ID): (
+        "SE÷Match¬~SG÷Ball Possession¬SH÷55%¬SI÷45%¬~SG÷Goal Attempts¬SH÷14¬SI÷9¬~"
+        "SE÷1st Half¬~SG÷Ball Possession¬SH÷60%¬SI÷40%¬~"
+    ),
+    COMMENTARY_FEED.format(match_id=MATCH_ID): "MB÷90+2'¬MD÷Full time.¬~MB÷¬MD÷Kick-off.¬~",
+}
+
+
+@pytest.fixture
+def feed_url(tmp_path):
+    """A replay server on a free port serving RECORDINGS"""
+    for feed, body in RECORDINGS.items():
+        (tmp_path / feed).write_text(body, encoding="utf-8")
+    server = serve(str(tmp_path), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://{server.server_address[0]}:{server.server_address[1]}/2/x/feed/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_match_details_against_replay_server(feed_url):
+    record = FeedClient(feed_url).get_match_details(MATCH_ID, "finished")
+
+    assert record["id"] == MATCH_ID
+    assert record["tournament"] == "ENGLAND: Premier League"
+    assert record["home_team"] == "Chelsea"
+    assert record["away_team"] == "Arsenal"
+    assert record["score"] == {"match_status": "finished", "final_result": "2-1"}
+    assert record["local_datetime"].startswith("2025-05-0")
+    assert set(record["statistics"]) == {"full_time", "1st_half"}
+    assert len(record["statistics"]["full_time"]) == 2
+    assert record["commentary"] == [["90+2", "Full time."], ["0", "Kick-off."]]
+
+
+def test_missing_recording_keeps_the_rest(feed_url):
+    client = FeedClient(feed_url)
+    record = client.get_match_details("unknown1", "finished")
+
+    assert record == {"id": "unknown1"}
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+logger = logging.getLogger(__name__)
+
+# Constants
+WAIT_TIME = 20
+POLL_FREQUENCY = 0.1  # WebDriverWait defaults to 0.5 s between checks
+
+# Resolves as soon as a node matching the selector is in the DOM, or null on timeout
+MUTATION_WAIT_JS = """
+    var selector = arguments[0];
+    var minCount = arguments[1];
+    var timeoutMs = arguments[2];
+    var done = arguments[arguments.length - 1];
+    if (document.querySelectorAll(selector).length >= minCount) {
+        done(true);
+        return;
+    }
+    var observer = new MutationObserver(function() {
+        if (document.querySelectorAll(selector).length >= minCount) {
+            observer.disconnect();
+            clearTimeout(timer);
+            done(true);
+        }
+    });
+    var timer = setTimeout(function() {
+        observer.disconnect();
+        done(false);
+    }, timeoutMs);
+    observer.observe(document.documentElement, {childList: true, subtree: true});
+"""
+
+
+def wait_for_selector(driver, selector: str, timeout: float = WAIT_TIME, clickable: bool = False):
+    """Return the first element matching a CSS selector as soon as it is ready, or None"""
+    condition = EC.element_to_be_clickable if clickable else EC.presence_of_element_located
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(
+            condition((By.CSS_SELECTOR, selector))
+        )
+    except TimeoutException:
+        logger.info(f"Timeout waiting for selector: {selector}")
+        return None
+
+
+def wait_for_any(driver, selectors: Iterable[str], timeout: float = WAIT_TIME) -> Optional[str]:
+    """Wait until any of the selectors matches and return the one that did"""
+    selectors = list(selectors)
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(
+            lambda d: next((s for s in selectors if d.find_elements(By.CSS_SELECTOR, s)), False)
+        )
+    except TimeoutException:
+        logger.info(f"Timeout waiting for any of: {selectors}")
+        return None
+
+
+def wait_for_count(driver, selector: str, min_count: int, timeout: float = WAIT_TIME) -> bool:
+    """Wait for at least min_count matches using an in-page MutationObserver"""
+    try:
+        driver.set_script_timeout(timeout + 5)
+        return bool(driver.execute_async_script(MUTATION_WAIT_JS, selector, min_count, int(timeout * 1000)))
+    except WebDriverException as e:
+        logger.warning(f"MutationObserver wait failed for {selector}: {e}")
+        return False
+
+
+def wait_for_dom_ready(driver, timeout: float = WAIT_TIME) -> bool:
+    """Wait for document.readyState to reach interactive or complete"""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(
+            lambda d: d.execute_script('return document.readyState') in ('interactive', 'complete')
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_stale(driver, element, timeout: float = 2) -> bool:
+    """Wait for an element to be replaced, e.g. after switching a statistics tab"""
+    if element is None:
+        return True
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(EC.staleness_of(element))
+        return True
+    except TimeoutException:
+        return False
+
+
+class OptionalLookup:
+    """Looks up elements that are often absent without paying the implicit wait on a miss"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.page = None
+        self.lookups = 0
+        self.misses = 0
+        self.miss_seconds = 0.0
+        self.implicit_wait = self._implicit_wait()
+        self._suspended = False
+
+    def _implicit_wait(self) -> float:
+        try:
+            return float(self.driver.timeouts.implicit_wait)
+        except Exception:
+            return 0.0
+
+    def start_page(self, page: str):
+        """Reset the counters for a new page"""
+        self.page = page
+        self.lookups = 0
+        self.misses = 0
+        self.miss_seconds = 0.0
+        self.implicit_wait = self._implicit_wait()
+
+    @contextmanager
+    def suspended(self):
+        """Turn the implicit wait off once for a batch of lookups"""
+        if self._suspended or not self.implicit_wait:
+            yield
+            return
+        self.driver.implicitly_wait(0)
+        self._suspended = True
+        try:
+            yield
+        finally:
+            self._suspended = False
+            self.driver.implicitly_wait(self.implicit_wait)
+
+    def find_all(self, by, value, root=None) -> list:
+        """Like find_elements, but returns at once when nothing matches"""
+        scope = root if root is not None else self.driver
+        started = time.monotonic()
+        with self.suspended():
+            elements = scope.find_elements(by, value)
+
+        self.lookups += 1
+        if not elements:
+            self.misses += 1
+            self.miss_seconds += time.monotonic() - started
+        return elements
+
+    def find(self, by, value, root=None):
+        """Return the first matching element or None"""
+        elements = self.find_all(by, value, root)
+        return elements[0] if elements else None
+
+    def report(self) -> dict:
+        """Time spent on absent elements for the current page, and what implicit waits would have cost"""
+        stats = {
+            "page": self.page,
+            "lookups": self.lookups,
+            "misses": self.misses,
+            "miss_seconds": round(self.miss_seconds, 3),
+            "implicit_wait_penalty_avoided": round(self.misses * self.implicit_wait, 3),
+        }
+        logger.info(f"Optional lookups on {self.page}: {stats}")
+        return stats
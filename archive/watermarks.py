@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+import json
+import logging
+import os
+import re
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Constants
+WATERMARK_FILE = "watermarks.json"
+TRAILING_DAYS = 3  # Re-read this many days before the watermark for postponed and late-finishing matches
+
+# Results rows show "17.05. 16:00" for the current season and "17.05.2024" for older ones
+ROW_DATE_RE = re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{4})?')
+
+
+def row_date(text: Optional[str], reference: Optional[date] = None) -> Optional[date]:
+    """Calendar date of a results row; a missing year is the latest one not after reference (default today)"""
+    match = ROW_DATE_RE.match(text or "")
+    if not match:
+        return None
+    day, month, year = int(match.group(1)), int(match.group(2)), match.group(3)
+    reference = reference or date.today()
+    if year is None:
+        year = reference.year if (month, day) <= (reference.month, reference.day) else reference.year - 1
+    try:
+        return date(int(year), month, day)
+    except ValueError:
+        return None
+
+
+class Watermarks:
+    """Last fully scraped date per league, persisted so the next run only covers newer days"""
+
+    def __init__(self, path: str = WATERMARK_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._marks: Dict[str, str] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._marks = json.load(f)
+
+    def get(self, league: str) -> Optional[date]:
+        mark = self._marks.get(league)
+        return datetime.strptime(mark, "%Y-%m-%d").date() if mark else None
+
+    def advance(self, league: str, day: date):
+        """Move a league's watermark forward (never back) and save right away"""
+        with self._lock:
+            current = self.get(league)
+            if current is not None and day <= current:
+                return
+            self._marks[league] = day.isoformat()
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._marks, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+
+    def start_date(self, league: str, default_start: date, trailing_days: int = TRAILING_DAYS) -> date:
+        """First date an incremental run needs: the trailing window before the watermark, or the season start"""
+        mark = self.get(league)
+        if mark is None:
+            return default_start
+        start = max(default_start, mark - timedelta(days=trailing_days))
+        logger.info(f"{league}: watermark {mark}, resuming from {start}")
+        return start
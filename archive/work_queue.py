@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+
+import argparse
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Constants
+QUEUE_FILE = "work_queue.sqlite"
+LEASE_SECONDS = 600     # An in-flight item whose worker died becomes claimable again after this
+MAX_ATTEMPTS = 3
+BUSY_TIMEOUT = 30       # Seconds to wait on another process's write lock
+
+MATCH = "match"
+DATE = "date"
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+STATES = (PENDING, IN_FLIGHT, DONE, FAILED)
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    kind TEXT NOT NULL,
+    item TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    owner TEXT,
+    last_error TEXT,
+    added_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (kind, item)
+);
+CREATE INDEX IF NOT EXISTS items_state ON items (kind, state, lease_until);
+"""
+
+
+class WorkQueue:
+    """Durable queue of match IDs and dates with leases, shared by threads, processes and hosts"""
+
+    def __init__(self, path: str = QUEUE_FILE, lease_seconds: float = LEASE_SECONDS,
+                 max_attempts: int = MAX_ATTEMPTS, owner: Optional[str] = None):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._leases: Dict[Tuple[str, str], float] = {}  # (kind, item) -> lease_until of this queue's claims
+        # Autocommit mode; multi-statement updates open their own BEGIN IMMEDIATE transaction.
+        # The default rollback journal (not WAL) keeps the file safe on shared network storage.
+        self._db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        self._db.executescript(QUEUE_SCHEMA)
+
+    def add(self, items: Iterable[str], kind: str = MATCH) -> int:
+        """Enqueue items; ones already known, in any state, are left alone"""
+        now = time.time()
+        with self._lock:
+            before = self._db.total_changes
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO items (kind, item, added_at, updated_at) VALUES (?, ?, ?, ?)",
+                    [(kind, item, now, now) for item in items]
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            return self._db.total_changes - before
+
+    def claim(self, kind: str = MATCH, limit: int = 1) -> List[str]:
+        """Lease up to limit pending items, or in-flight ones whose lease has run out"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # Every claim counted as an attempt, so a worker that died holding the last one used it up
+                expired = self._db.execute(
+                    """UPDATE items SET state = ?, lease_until = NULL, owner = NULL, updated_at = ?,
+                       last_error = 'lease expired after ' || attempts || ' attempts'
+                       WHERE kind = ? AND state = ? AND lease_until < ? AND attempts >= ?""",
+                    (FAILED, now, kind, IN_FLIGHT, now, self.max_attempts)
+                ).rowcount
+                rows = self._db.execute(
+                    """SELECT item FROM items
+                       WHERE kind = ? AND (state = ? OR (state = ? AND lease_until < ?))
+                       ORDER BY added_at, item LIMIT ?""",
+                    (kind, PENDING, IN_FLIGHT, now, limit)
+                ).fetchall()
+                items = [row[0] for row in rows]
+                self._db.executemany(
+                    """UPDATE items SET state = ?, attempts = attempts + 1, lease_until = ?, owner = ?, updated_at = ?
+                       WHERE kind = ? AND item = ?""",
+                    [(IN_FLIGHT, now + self.lease_seconds, self.owner, now, kind, item) for item in items]
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            for item in items:
+                self._leases[(kind, item)] = now + self.lease_seconds
+        if expired:
+            logger.warning(f"Marked {expired} {kind} items failed after their last lease expired")
+        return items
+
+    def complete(self, item: str, kind: str = MATCH) -> bool:
+        """Mark a claimed item done; False if its lease was lost to another claim"""
+        return self._set(kind, item, DONE)
+
+    def fail(self, item: str, error: str = "", kind: str = MATCH) -> Optional[str]:
+        """
+        Put the item back for another try, or mark it failed once its attempts are used up.
+        Returns the new state, or None if the lease was lost and the item was left to its new owner.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT attempts FROM items WHERE kind = ? AND item = ?", (kind, item)).fetchone()
+        state = FAILED if row is None or row[0] >= self.max_attempts else PENDING
+        return state if self._set(kind, item, state, error) else None
+
+    def _set(self, kind: str, item: str, state: str, error: Optional[str] = None) -> bool:
+        """Finish this queue's lease on an item; only the current lease holder may change it"""
+        with self._lock:
+            lease_until = self._leases.pop((kind, item), None)
+            cursor = self._db.execute(
+                """UPDATE items SET state = ?, lease_until = NULL, last_error = COALESCE(?, last_error), updated_at = ?
+                   WHERE kind = ? AND item = ? AND state = ? AND owner = ? AND lease_until = ?""",
+                (state, error, time.time(), kind, item, IN_FLIGHT, self.owner, lease_until)
+            )
+        if cursor.rowcount == 0:
+            logger.warning(f"Lost the lease on {kind} {item} to another claim; not marking it {state}")
+            return False
+        return True
+
+    def retry_failed(self, kind: str = MATCH) -> int:
+        """Give failed items a fresh set of attempts"""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE items SET state = ?, attempts = 0, updated_at = ? WHERE kind = ? AND state = ?",
+                (PENDING, time.time(), kind, FAILED)
+            )
+            return cursor.rowcount
+
+    def counts(self, kind: str = MATCH) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) FROM items WHERE kind = ? GROUP BY state", (kind,)).fetchall()
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(dict(rows))
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Inspect or maintain the scraper work queue")
+    parser.add_argument("--queue", type=str, default=QUEUE_FILE, help="Queue database file")
+    parser.add_argument("--kind", type=str, default=MATCH, choices=(MATCH, DATE))
+    parser.add_argument("--add", type=str, help="File with one item per line to enqueue")
+    parser.add_argument("--retry-failed", action="store_true", help="Move failed items back to pending")
+    args = parser.parse_args()
+
+    work_queue = WorkQueue(args.queue)
+    if args.add:
+        with open(args.add, "r") as f:
+            added = work_queue.add((line.strip() for line in f if line.strip()), args.kind)
+        logger.info(f"Added {added} new {args.kind} items")
+    if args.retry_failed:
+        logger.info(f"Retrying {work_queue.retry_failed(args.kind)} failed {args.kind} items")
+    print(work_queue.counts(args.kind))
+    work_queue.close()
+
+
+if __name__ == "__main__":
+    main()
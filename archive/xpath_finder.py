@@ -10,6 +10,8 @@ import time
 import logging
 import os
 
+import flashscore_selectors as sel
+
 # Set up logging to both file and console
 logging.basicConfig(
     level=logging.INFO,
@@ -76,11 +78,11 @@ class XPathFinder:
             # Try to identify key elements
             try:
                 # Look for tournament sections
-                tournaments = self.driver.find_elements(By.CLASS_NAME, "sportName")
+                tournaments = self.driver.find_elements(By.CSS_SELECTOR, sel.SPORT_SECTION.css)
                 logger.info(f"Found {len(tournaments)} tournament sections")
                 
                 # Look for matches
-                matches = self.driver.find_elements(By.CLASS_NAME, "event__match")
+                matches = self.driver.find_elements(By.CSS_SELECTOR, sel.MATCH_ROW.css)
                 logger.info(f"Found {len(matches)} matches")
                 
                 # Print sample XPaths if elements are found